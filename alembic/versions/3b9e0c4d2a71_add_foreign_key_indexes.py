@@ -0,0 +1,60 @@
+"""Add foreign key indexes on summaries and comments
+
+Revision ID: 3b9e0c4d2a71
+Revises: fff679895c66
+Create Date: 2026-10-18 10:40:12.318904
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "3b9e0c4d2a71"
+down_revision = "fff679895c66"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction block
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_summaries_user_id_id",
+            "summaries",
+            ["user_id", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_comments_user_id_id",
+            "comments",
+            ["user_id", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_comments_summary_id_id",
+            "comments",
+            ["summary_id", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_comments_summary_id_id",
+            table_name="comments",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_comments_user_id_id",
+            table_name="comments",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_summaries_user_id_id",
+            table_name="summaries",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,53 @@
+"""Add full-text search vector to summaries
+
+Revision ID: 8d2f6a1c9e34
+Revises: 3b9e0c4d2a71
+Create Date: 2026-10-18 11:52:37.604518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "8d2f6a1c9e34"
+down_revision = "3b9e0c4d2a71"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # A stored generated column is filled by rewriting the table
+    op.add_column(
+        "summaries",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('simple', coalesce(title, '')), 'A')"
+                " || setweight(to_tsvector('simple', coalesce(description, '')), 'B')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_summaries_search_vector",
+            "summaries",
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_summaries_search_vector",
+            table_name="summaries",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("summaries", "search_vector")
@@ -0,0 +1,53 @@
+"""Add trigram indexes on usernames and summary titles
+
+Revision ID: c51e7b2d4f08
+Revises: 8d2f6a1c9e34
+Create Date: 2026-10-18 13:06:12.318842
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "c51e7b2d4f08"
+down_revision = "8d2f6a1c9e34"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_users_username_trgm",
+            "users",
+            ["username"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"username": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_summaries_title_trgm",
+            "summaries",
+            ["title"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    # pg_trgm is left installed, other objects in the database may use it
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_summaries_title_trgm",
+            table_name="summaries",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_users_username_trgm",
+            table_name="users",
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,118 @@
+"""Add comment and summary counters maintained by triggers
+
+Revision ID: e7a94c3b1d52
+Revises: c51e7b2d4f08
+Create Date: 2026-10-18 14:21:45.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e7a94c3b1d52"
+down_revision = "c51e7b2d4f08"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Constant defaults don't rewrite the tables
+    op.add_column(
+        "users",
+        sa.Column("summary_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "users",
+        sa.Column("comment_count", sa.Integer(), server_default="0", nullable=False),
+    )
+    op.add_column(
+        "summaries",
+        sa.Column("comment_count", sa.Integer(), server_default="0", nullable=False),
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION count_summaries() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            sign integer := CASE TG_OP WHEN 'INSERT' THEN 1 ELSE -1 END;
+        BEGIN
+            UPDATE users SET summary_count = summary_count + sign * d.n
+            FROM (SELECT user_id, count(*) AS n FROM changed GROUP BY user_id) AS d
+            WHERE users.id = d.user_id;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION count_comments() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        DECLARE
+            sign integer := CASE TG_OP WHEN 'INSERT' THEN 1 ELSE -1 END;
+        BEGIN
+            UPDATE summaries SET comment_count = comment_count + sign * d.n
+            FROM (SELECT summary_id, count(*) AS n FROM changed GROUP BY summary_id) AS d
+            WHERE summaries.id = d.summary_id;
+            UPDATE users SET comment_count = comment_count + sign * d.n
+            FROM (SELECT user_id, count(*) AS n FROM changed GROUP BY user_id) AS d
+            WHERE users.id = d.user_id;
+            RETURN NULL;
+        END
+        $$
+        """
+    )
+    for table, function in (
+        ("summaries", "count_summaries"),
+        ("comments", "count_comments"),
+    ):
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_count_insert AFTER INSERT ON {table}
+            REFERENCING NEW TABLE AS changed
+            FOR EACH STATEMENT EXECUTE FUNCTION {function}()
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER {table}_count_delete AFTER DELETE ON {table}
+            REFERENCING OLD TABLE AS changed
+            FOR EACH STATEMENT EXECUTE FUNCTION {function}()
+            """
+        )
+
+    # The ALTERs above hold the tables until commit, so nothing is counted twice
+    op.execute(
+        """
+        UPDATE summaries SET comment_count = d.n
+        FROM (SELECT summary_id, count(*) AS n FROM comments GROUP BY summary_id) AS d
+        WHERE summaries.id = d.summary_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE users SET summary_count = d.n
+        FROM (SELECT user_id, count(*) AS n FROM summaries GROUP BY user_id) AS d
+        WHERE users.id = d.user_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE users SET comment_count = d.n
+        FROM (SELECT user_id, count(*) AS n FROM comments GROUP BY user_id) AS d
+        WHERE users.id = d.user_id
+        """
+    )
+
+
+def downgrade() -> None:
+    for table in ("summaries", "comments"):
+        op.execute(f"DROP TRIGGER {table}_count_insert ON {table}")
+        op.execute(f"DROP TRIGGER {table}_count_delete ON {table}")
+    op.execute("DROP FUNCTION count_comments()")
+    op.execute("DROP FUNCTION count_summaries()")
+    op.drop_column("summaries", "comment_count")
+    op.drop_column("users", "comment_count")
+    op.drop_column("users", "summary_count")
@@ -0,0 +1,178 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+from src import init_app
+from src.config import settings
+from src.db import session_manager
+from src.redis import RedisClient
+from .datagen import Dataset, load, reset
+from .micro import hashing_cases, hydration_cases, measure, serialization_cases
+from .report import (
+    build_micro_report,
+    build_report,
+    compare,
+    compare_cases,
+    write_report,
+)
+from .scenarios import Scenarios, run
+
+
+async def clear_cache() -> None:
+    # Ids are reused after a reset, cached bodies of the old rows must go
+    keys = [key async for key in RedisClient().aconn.scan_iter("cache:*")]
+    if keys:
+        await RedisClient().aconn.delete(*keys)
+
+
+async def benchmark(args: argparse.Namespace) -> dict:
+    dataset = Dataset(args.users, args.summaries, args.comments, args.seed)
+    session_manager.init(args.database_url)
+    RedisClient(settings.REDIS_HOST, settings.REDIS_PASSWORD)
+    app = init_app(init_db=False)
+    try:
+        async with session_manager.connect() as connection:
+            await reset(connection)
+        async with session_manager.session() as db:
+            await load(db, dataset)
+        async with session_manager.connect() as connection:
+            # Fresh statistics, otherwise the planner guesses on empty tables
+            await connection.execute(text("ANALYZE"))
+        await clear_cache()
+
+        scenarios = Scenarios(dataset).all()
+        results = {}
+        # Unhandled errors (deadlocks, pool timeouts) count as 500s, not crashes
+        transport = ASGITransport(app=app, raise_app_exceptions=False)
+        async with AsyncClient(
+            transport=transport, base_url="http://benchmark"
+        ) as client:
+            for name in args.scenario or scenarios:
+                rng = random.Random(f"{args.seed}:{name}")
+                requests = args.requests
+                if name == "user_deletion":
+                    requests = min(requests, dataset.users - 1)
+                results[name] = await run(
+                    client, scenarios[name], rng, requests, args.concurrency
+                )
+                print(name, json.dumps(results[name]), file=sys.stderr)
+    finally:
+        await RedisClient().close()
+        await session_manager.close()
+
+    return build_report(
+        {
+            "users": dataset.users,
+            "summaries": dataset.summaries,
+            "comments": dataset.comments,
+            "seed": dataset.seed,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        results,
+    )
+
+
+async def micro(args: argparse.Namespace) -> dict:
+    cases = {**serialization_cases(), **hashing_cases()}
+    try:
+        if args.database_url:
+            cases.update(await hydration_cases(args.database_url))
+        results = {}
+        for name, case in cases.items():
+            if args.k and not any(pattern in name for pattern in args.k):
+                continue
+            results[name] = await measure(case, args.max_time)
+            print(name, json.dumps(results[name]), file=sys.stderr)
+    finally:
+        if args.database_url:
+            await session_manager.close()
+    return build_micro_report(results)
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser(
+        "run", help="load a synthetic dataset and time the load scenarios"
+    )
+    run_parser.add_argument(
+        "--database-url",
+        required=True,
+        help="database to DROP and refill, never point this at real data",
+    )
+    run_parser.add_argument("--users", type=int, default=1000)
+    run_parser.add_argument("--summaries", type=int, default=5000)
+    run_parser.add_argument("--comments", type=int, default=50000)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--requests", type=int, default=2000)
+    run_parser.add_argument("--concurrency", type=int, default=20)
+    run_parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=["login_storm", "feed_reads", "comment_burst", "user_deletion"],
+        help="run only these scenarios, may be repeated",
+    )
+    run_parser.add_argument("--out", default="benchmark.json")
+
+    micro_parser = commands.add_parser(
+        "micro", help="time serialization, ORM hydration and password hashing"
+    )
+    micro_parser.add_argument(
+        "--database-url",
+        help="database to DROP and seed for the hydration cases, skipped if unset",
+    )
+    micro_parser.add_argument(
+        "-k", action="append", help="run only cases containing this, may be repeated"
+    )
+    micro_parser.add_argument(
+        "--max-time", type=float, default=1.0, help="seconds spent on each case"
+    )
+    micro_parser.add_argument("--out", default="micro.json")
+
+    compare_parser = commands.add_parser(
+        "compare", help="compare two reports of the same kind, fail on regressions"
+    )
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=10,
+        help="allowed growth of p95 (run) or median time (micro) in percent",
+    )
+    compare_parser.add_argument(
+        "--alloc-threshold",
+        type=float,
+        default=10,
+        help="allowed growth of peak memory (micro) in percent",
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        report = asyncio.run(benchmark(args))
+        write_report(args.out, report)
+        print(json.dumps(report, indent=2))
+    elif args.command == "micro":
+        report = asyncio.run(micro(args))
+        write_report(args.out, report)
+    elif args.command == "compare":
+        with open(args.old) as old_file, open(args.new) as new_file:
+            old, new = json.load(old_file), json.load(new_file)
+        if "cases" in old:
+            lines, regressed = compare_cases(
+                old, new, args.threshold, args.alloc_threshold
+            )
+        else:
+            lines, regressed = compare(old, new, args.threshold)
+        print("\n".join(lines))
+        if regressed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import random
+import string
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Iterator
+from sqlalchemy import insert as sa_insert
+from sqlalchemy import select as sa_select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from src.db import session_manager
+from src.enums import RoleEnum
+from src.models import Role
+from src.security import get_password_hash
+from src.services.importer import copy_records
+
+PASSWORD = "password"
+# Zipf exponent: a few users write most summaries, a few summaries draw most comments
+SKEW = 1.1
+CHUNK_SIZE = 10_000
+_vocabulary = random.Random(0)
+WORDS = [
+    "".join(_vocabulary.choices(string.ascii_lowercase, k=_vocabulary.randint(2, 10)))
+    for _ in range(2000)
+]
+
+
+def username(index: int) -> str:
+    return f"user{index}"
+
+
+def zipf_weights(n: int) -> list[float]:
+    # Cumulative, so each draw doesn't sum the weights again
+    return list(accumulate(1 / (rank**SKEW) for rank in range(1, n + 1)))
+
+
+def sentence(rng: random.Random, min_length: int, max_length: int) -> str:
+    length = min(int(rng.lognormvariate(4, 1)) + min_length, max_length)
+    words = []
+    while sum(map(len, words)) + len(words) < length:
+        words.append(rng.choice(WORDS))
+    return " ".join(words)[:length].strip().ljust(min_length, "x")
+
+
+def chunks(rows: list[tuple]) -> Iterator[list[tuple]]:
+    for start in range(0, len(rows), CHUNK_SIZE):
+        yield rows[start : start + CHUNK_SIZE]
+
+
+class Dataset:
+    def __init__(self, users: int, summaries: int, comments: int, seed: int):
+        self.users = users
+        self.summaries = summaries
+        self.comments = comments
+        self.seed = seed
+
+    def rows(self, user_role: int, admin_role: int) -> dict[str, list[tuple]]:
+        # Everything derives from the seed, so two runs load identical tables
+        rng = random.Random(self.seed)
+        epoch = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+        def moment() -> datetime:
+            return epoch + timedelta(seconds=rng.randrange(365 * 24 * 3600))
+
+        hashed_password = get_password_hash(PASSWORD)
+        users = []
+        for index in range(1, self.users + 1):
+            created = moment()
+            role = admin_role if index == 1 else user_role
+            email = f"{username(index)}@example.com" if rng.random() < 0.7 else None
+            fio = sentence(rng, 5, 50) if rng.random() < 0.5 else None
+            users.append(
+                (username(index), hashed_password, email, fio, role, created, created)
+            )
+
+        # Authors and commenters are ranked independently, so the busiest
+        # writers aren't also the busiest commenters
+        user_ids = list(range(1, self.users + 1))
+        authors = rng.sample(user_ids, len(user_ids))
+        commenters = rng.sample(user_ids, len(user_ids))
+        user_weights = zipf_weights(self.users)
+
+        summaries = []
+        for user_id in rng.choices(authors, cum_weights=user_weights, k=self.summaries):
+            created = moment()
+            description = sentence(rng, 10, 1000) if rng.random() < 0.8 else None
+            summaries.append(
+                (sentence(rng, 2, 50), description, user_id, created, created)
+            )
+
+        summary_ids = rng.sample(range(1, self.summaries + 1), self.summaries)
+        summary_weights = zipf_weights(self.summaries)
+        comments = []
+        for summary_id, user_id in zip(
+            rng.choices(summary_ids, cum_weights=summary_weights, k=self.comments),
+            rng.choices(commenters, cum_weights=user_weights, k=self.comments),
+        ):
+            created = moment()
+            comments.append(
+                (sentence(rng, 1, 360), user_id, summary_id, created, created)
+            )
+
+        return {"users": users, "summaries": summaries, "comments": comments}
+
+
+async def reset(connection: AsyncConnection) -> None:
+    await session_manager.drop_all(connection)
+    await session_manager.create_all(connection)
+    roles = [{"name": role.name, "description": role.value} for role in RoleEnum]
+    await connection.execute(sa_insert(Role), roles)
+
+
+async def load(db: AsyncSession, dataset: Dataset) -> None:
+    # Expects empty tables, ids are assumed to start at 1
+    roles = dict((await db.execute(sa_select(Role.name, Role.id))).all())
+    tables = dataset.rows(roles["user"], roles["admin"])
+    columns = {
+        "users": [
+            "username",
+            "hashed_password",
+            "email",
+            "fio",
+            "role_id",
+            "created_at",
+            "updated_at",
+        ],
+        "summaries": ["title", "description", "user_id", "created_at", "updated_at"],
+        "comments": ["text", "user_id", "summary_id", "created_at", "updated_at"],
+    }
+    for table in ("users", "summaries", "comments"):
+        for chunk in chunks(tables[table]):
+            await copy_records(db, table, columns[table], chunk)
+    await db.commit()
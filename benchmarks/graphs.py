@@ -0,0 +1,86 @@
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from itertools import count
+from src.enums import RoleEnum
+from src.models import Comment, Role, Summary, User
+from .datagen import WORDS, username
+
+
+class Graph:
+    # Transient ORM objects shaped like a "full" load. Ids are unique across
+    # everything one Graph builds and every object is reachable from the one
+    # returned, so adding that to a session inserts the whole graph.
+    def __init__(self, seed: int = 0, role: Role | None = None):
+        self.rng = random.Random(seed)
+        self.ids = defaultdict(lambda: count(1))
+        self.epoch = datetime(2023, 1, 1, tzinfo=timezone.utc)
+        self.role = role or Role(id=1, name=RoleEnum.user.name, description="")
+
+    def moment(self) -> datetime:
+        return self.epoch + timedelta(seconds=self.rng.randrange(365 * 24 * 3600))
+
+    def text(self, words: int) -> str:
+        return " ".join(self.rng.choices(WORDS, k=words))
+
+    def user(self) -> User:
+        user_id = next(self.ids["users"])
+        created = self.moment()
+        return User(
+            id=user_id,
+            username=username(user_id),
+            hashed_password="x",
+            email=f"{username(user_id)}@example.com",
+            fio=self.text(3)[:50],
+            role=self.role,
+            created_at=created,
+            updated_at=created,
+            summary_count=0,
+            comment_count=0,
+        )
+
+    def summary(self, author: User) -> Summary:
+        created = self.moment()
+        summary = Summary(
+            id=next(self.ids["summaries"]),
+            title=self.text(4)[:50],
+            description=self.text(60)[:1000],
+            comment_count=0,
+            created_at=created,
+            updated_at=created,
+        )
+        summary.user = author
+        author.summary_count += 1
+        return summary
+
+    def comment(self, author: User, summary: Summary) -> Comment:
+        created = self.moment()
+        comment = Comment(
+            id=next(self.ids["comments"]),
+            text=self.text(25)[:360],
+            created_at=created,
+            updated_at=created,
+        )
+        # Backrefs append the comment to both parents' lists
+        comment.user = author
+        comment.summary = summary
+        author.comment_count += 1
+        summary.comment_count += 1
+        return comment
+
+    def user_with_comments(self, comments: int, summaries: int = 50) -> User:
+        # Commented summaries belong to other users, like on the real site
+        user = self.user()
+        for _ in range(summaries):
+            self.summary(user)
+        others = [self.summary(self.user()) for _ in range(comments // 20)]
+        for index in range(comments):
+            self.comment(user, others[index % len(others)])
+        return user
+
+    def summary_with_comments(self, comments: int) -> Summary:
+        summary = self.summary(self.user())
+        commenters = [self.user() for _ in range(comments // 2)]
+        for index in range(comments):
+            self.comment(commenters[index % len(commenters)], summary)
+        return summary
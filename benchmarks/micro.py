@@ -0,0 +1,152 @@
+import gc
+import inspect
+import statistics
+import time
+import tracemalloc
+from typing import Any, Awaitable, Callable
+from sqlalchemy import select as sa_select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.db import session_manager
+from src.enums import RoleEnum
+from src.models import Role
+from src.schemas.summary import SummarySchema
+from src.schemas.user import UserSchema
+from src.security import get_password_hash, verify_password
+from src.serializers import compile_serializer, dumps
+from src.services import counters
+from src.services import summary as summary_service
+from src.services import user as user_service
+from .datagen import PASSWORD, reset
+from .graphs import Graph
+
+Case = Callable[[], Any | Awaitable[Any]]
+
+# Shapes of the heaviest responses: GET /users/{id} and GET /summaries/{id}
+USER_COMMENTS = 1000
+SUMMARY_COMMENTS = 500
+MIN_ROUNDS = 5
+# A round repeats the call until it takes this long, so fast cases aren't
+# dominated by timer resolution
+ROUND_TIME = 0.01
+
+
+def milliseconds(seconds: float) -> float:
+    return round(seconds * 1000, 4)
+
+
+async def call(case: Case) -> Any:
+    result = case()
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def timed(case: Case, number: int) -> float:
+    start = time.perf_counter()
+    for _ in range(number):
+        await call(case)
+    return time.perf_counter() - start
+
+
+async def measure(case: Case, max_time: float) -> dict:
+    # pytest-benchmark's scheme: calibrate calls per round, then run rounds
+    # until max_time is spent (at least MIN_ROUNDS); stats are per call
+    await call(case)
+    number = 1
+    while (elapsed := await timed(case, number)) < ROUND_TIME:
+        number *= 10 if elapsed < ROUND_TIME / 10 else 2
+    rounds = []
+    deadline = time.perf_counter() + max_time
+    while len(rounds) < MIN_ROUNDS or time.perf_counter() < deadline:
+        rounds.append(await timed(case, number) / number)
+
+    # Measured apart from timing, tracing makes every allocation slower
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = await call(case)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+
+    median = statistics.median(rounds)
+    return {
+        "rounds": len(rounds),
+        "calls_per_round": number,
+        "min_ms": milliseconds(min(rounds)),
+        "median_ms": milliseconds(median),
+        "mean_ms": milliseconds(statistics.fmean(rounds)),
+        "stddev_ms": milliseconds(statistics.stdev(rounds)),
+        "ops": round(1 / median, 1),
+        # Peak is everything alive at once during the call, retained is
+        # what the result still holds on to
+        "peak_kib": round((peak - before) / 1024, 1),
+        "retained_kib": round((current - before) / 1024, 1),
+    }
+
+
+def serialization_cases() -> dict[str, Case]:
+    graph = Graph()
+    user = graph.user_with_comments(USER_COMMENTS)
+    summary = graph.summary_with_comments(SUMMARY_COMMENTS)
+    serialize_user = compile_serializer(UserSchema)
+    serialize_summary = compile_serializer(SummarySchema)
+    return {
+        "user_1k_comments/from_orm": lambda: UserSchema.from_orm(user).dict(),
+        "user_1k_comments/compiled": lambda: serialize_user(user),
+        "user_1k_comments/json": lambda: dumps(UserSchema, user),
+        "summary_500_comments/from_orm": lambda: SummarySchema.from_orm(summary).dict(),
+        "summary_500_comments/compiled": lambda: serialize_summary(summary),
+        "summary_500_comments/json": lambda: dumps(SummarySchema, summary),
+    }
+
+
+def hashing_cases() -> dict[str, Case]:
+    hashed_password = get_password_hash(PASSWORD)
+    return {
+        "login/hash": lambda: get_password_hash(PASSWORD),
+        "login/verify": lambda: verify_password(PASSWORD, hashed_password),
+    }
+
+
+async def seed(db: AsyncSession) -> tuple[int, int]:
+    query = sa_select(Role).where(Role.name == RoleEnum.user.name)
+    role = (await db.execute(query)).scalar_one()
+    # Detached, so building the graph doesn't cascade half-built users into
+    # the session through Role.users
+    db.expunge(role)
+    graph = Graph(role=role)
+    user = graph.user_with_comments(USER_COMMENTS)
+    summary = graph.summary_with_comments(SUMMARY_COMMENTS)
+    db.add_all([user, summary])
+    await db.flush()
+    # The counter triggers added to the counts the graph already carried
+    await counters.recount_summaries(db)
+    await counters.recount_users(db)
+    await db.commit()
+    return user.id, summary.id
+
+
+async def hydration_cases(database_url: str) -> dict[str, Case]:
+    # Rows come from a real database, each call gets a fresh session like a
+    # request would, so nothing is served from the identity map
+    session_manager.init(database_url)
+    async with session_manager.connect() as connection:
+        await reset(connection)
+    async with session_manager.session() as db:
+        user_id, summary_id = await seed(db)
+
+    async def hydrate_user():
+        async with session_manager.session() as db:
+            return await user_service.get_by_id(db, user_id, "full")
+
+    async def hydrate_summary():
+        async with session_manager.session() as db:
+            return await summary_service.get_by_id(db, summary_id, "full")
+
+    return {
+        "user_1k_comments/hydrate": hydrate_user,
+        "summary_500_comments/hydrate": hydrate_summary,
+    }
@@ -0,0 +1,119 @@
+import json
+import math
+import platform
+import subprocess
+from datetime import datetime, timezone
+from typing import Mapping, Sequence
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(ordered: Sequence[float], q: float) -> float:
+    # Nearest rank, so the value is one that was actually measured
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(
+    latencies: Sequence[float],
+    statuses: Mapping[int, int],
+    elapsed: float,
+    concurrency: int,
+) -> dict:
+    ordered = sorted(latencies)
+    latency_ms = {f"p{q}": round(percentile(ordered, q) * 1000, 2) for q in PERCENTILES}
+    latency_ms["max"] = round(ordered[-1] * 1000, 2)
+    return {
+        "requests": len(ordered),
+        "concurrency": concurrency,
+        "errors": sum(n for status, n in statuses.items() if status >= 500),
+        "statuses": {str(status): n for status, n in sorted(statuses.items())},
+        "rps": round(len(ordered) / elapsed, 1),
+        "latency_ms": latency_ms,
+    }
+
+
+def current_commit() -> str | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def build_report(dataset: dict, scenarios: dict[str, dict]) -> dict:
+    return {
+        "commit": current_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "dataset": dataset,
+        "scenarios": scenarios,
+    }
+
+
+def build_micro_report(cases: dict[str, dict]) -> dict:
+    return {
+        "commit": current_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "cases": cases,
+    }
+
+
+def write_report(path: str, report: dict) -> None:
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+        file.write("\n")
+
+
+def growth(before: float, after: float) -> float:
+    return (after / max(before, 1e-9) - 1) * 100
+
+
+def compare(old: dict, new: dict, threshold: float) -> tuple[list[str], bool]:
+    # Regressed when any shared scenario's p95 grew by more than threshold %
+    lines, regressed = [], False
+    if old["dataset"] != new["dataset"]:
+        lines.append("warning: the runs used different datasets")
+    for name in sorted(old["scenarios"].keys() & new["scenarios"].keys()):
+        before, after = old["scenarios"][name], new["scenarios"][name]
+        changes = []
+        for key in (*(f"p{q}" for q in PERCENTILES), "max"):
+            changes.append(
+                f"{key} {before['latency_ms'][key]} -> {after['latency_ms'][key]} ms"
+            )
+        changes.append(f"rps {before['rps']} -> {after['rps']}")
+        p95 = growth(before["latency_ms"]["p95"], after["latency_ms"]["p95"])
+        if p95 > threshold:
+            regressed = True
+            changes.append(f"REGRESSED {p95:+.0f}% p95")
+        lines.append(f"{name}: " + ", ".join(changes))
+    return lines, regressed
+
+
+def compare_cases(
+    old: dict, new: dict, threshold: float, alloc_threshold: float
+) -> tuple[list[str], bool]:
+    # Regressed when a shared case's median time or peak memory grew too much
+    lines, regressed = [], False
+    if old["python"] != new["python"]:
+        lines.append("warning: the runs used different Python versions")
+    for name in sorted(old["cases"].keys() & new["cases"].keys()):
+        before, after = old["cases"][name], new["cases"][name]
+        changes = [
+            f"median {before['median_ms']} -> {after['median_ms']} ms",
+            f"peak {before['peak_kib']} -> {after['peak_kib']} KiB",
+        ]
+        duration = growth(before["median_ms"], after["median_ms"])
+        if duration > threshold:
+            regressed = True
+            changes.append(f"REGRESSED {duration:+.0f}% time")
+        memory = growth(before["peak_kib"], after["peak_kib"])
+        if memory > alloc_threshold:
+            regressed = True
+            changes.append(f"REGRESSED {memory:+.0f}% memory")
+        lines.append(f"{name}: " + ", ".join(changes))
+    return lines, regressed
@@ -0,0 +1,103 @@
+import asyncio
+import random
+import time
+from collections import Counter
+from typing import Awaitable, Callable
+from fastapi_jwt_auth import AuthJWT
+from httpx import AsyncClient, Response
+from src.pagination import encode_cursor
+from .datagen import PASSWORD, Dataset, username, zipf_weights
+from .report import summarize
+
+Request = Callable[[AsyncClient, random.Random], Awaitable[Response]]
+
+
+def token(user_id: int, role: str = "user") -> dict[str, str]:
+    # Same claims as /auth/login, without paying bcrypt for every user
+    user_claims = {"user_claims": {"id": user_id, "role": role}}
+    access_token = AuthJWT().create_access_token(
+        subject=username(user_id), user_claims=user_claims
+    )
+    return {"Authorization": f"Bearer {access_token}"}
+
+
+class Scenarios:
+    def __init__(self, dataset: Dataset):
+        self.dataset = dataset
+        self.reader = token(1, "admin")
+        # Popularity ranks independent of the generator's, hot rows are spread
+        rng = random.Random(f"{dataset.seed}:popularity")
+        self.summary_ids = rng.sample(
+            range(1, dataset.summaries + 1), dataset.summaries
+        )
+        self.summary_weights = zipf_weights(dataset.summaries)
+        self.user_ids = rng.sample(range(2, dataset.users + 1), dataset.users - 1)
+
+    def hot_summary(self, rng: random.Random) -> int:
+        return rng.choices(self.summary_ids, cum_weights=self.summary_weights)[0]
+
+    async def login_storm(self, client: AsyncClient, rng: random.Random) -> Response:
+        user_id = rng.randint(1, self.dataset.users)
+        return await client.post(
+            "/auth/login", json={"username": username(user_id), "password": PASSWORD}
+        )
+
+    async def feed_reads(self, client: AsyncClient, rng: random.Random) -> Response:
+        if rng.random() < 0.6:
+            after = rng.randint(0, self.dataset.summaries)
+            return await client.get(
+                f"/summaries?limit=20&after={encode_cursor(after)}",
+                headers=self.reader,
+            )
+        return await client.get(
+            f"/summaries/{self.hot_summary(rng)}", headers=self.reader
+        )
+
+    async def comment_burst(self, client: AsyncClient, rng: random.Random) -> Response:
+        user_id = rng.randint(1, self.dataset.users)
+        return await client.post(
+            "/comments",
+            json={
+                "text": f"burst comment {rng.random()}",
+                "user_id": user_id,
+                "summary_id": self.hot_summary(rng),
+            },
+        )
+
+    async def user_deletion(self, client: AsyncClient, rng: random.Random) -> Response:
+        # Every call deletes another user, each with their own token
+        user_id = self.user_ids.pop()
+        return await client.delete(f"/users/{user_id}", headers=token(user_id))
+
+    def all(self) -> dict[str, Request]:
+        # Deletions go last, they remove rows the others read
+        return {
+            "login_storm": self.login_storm,
+            "feed_reads": self.feed_reads,
+            "comment_burst": self.comment_burst,
+            "user_deletion": self.user_deletion,
+        }
+
+
+async def run(
+    client: AsyncClient,
+    request: Request,
+    rng: random.Random,
+    requests: int,
+    concurrency: int,
+) -> dict:
+    latencies: list[float] = []
+    statuses: Counter[int] = Counter()
+    pending = iter(range(requests))
+
+    async def worker() -> None:
+        # Workers share one iterator, so exactly `requests` calls are made
+        for _ in pending:
+            start = time.perf_counter()
+            response = await request(client, rng)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - started, concurrency)
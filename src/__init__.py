@@ -1,8 +1,13 @@
 from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from src.config import settings
 from src.db import session_manager
+from . import metrics
+from .profiling import ProfilerMiddleware
+from .querystats import QueryStatsMiddleware
 from .redis import RedisClient
+from .security import password_hasher
 
 
 def init_app(init_db=True):
@@ -17,13 +22,22 @@ def init_app(init_db=True):
             yield
             if session_manager._engine is not None:
                 await session_manager.close()
+            await RedisClient().close()
+            password_hasher.shutdown()
+            metrics.shutdown()
 
-    server = FastAPI(title="My FastAPI Server", lifespan=lifespan)
+    server = FastAPI(
+        title="My FastAPI Server",
+        lifespan=lifespan,
+        default_response_class=ORJSONResponse,
+    )
 
     from .routers.user import users_router
     from .routers.auth import auth_router
     from .routers.summary import summaries_router
     from .routers.comment import comments_router
+    from .routers.metrics import metrics_router
+    from .routers.profile import profiles_router
     from .handlers import auth_jwt_exception_handler
     from fastapi_jwt_auth.exceptions import AuthJWTException
     from fastapi.middleware.cors import CORSMiddleware
@@ -36,6 +50,8 @@ def init_app(init_db=True):
     server.include_router(users_router)
     server.include_router(summaries_router)
     server.include_router(comments_router)
+    server.include_router(metrics_router)
+    server.include_router(profiles_router)
     server.add_exception_handler(AuthJWTException, auth_jwt_exception_handler)
     server.add_middleware(
         CORSMiddleware,
@@ -43,6 +59,11 @@ def init_app(init_db=True):
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=["Link", "ETag"],
     )
+    server.add_middleware(ProfilerMiddleware)
+    server.add_middleware(QueryStatsMiddleware)
+    # Added last so it's outermost and times the other middleware too
+    server.add_middleware(metrics.MetricsMiddleware)
 
     return server
@@ -0,0 +1,42 @@
+from typing import Sequence
+from fastapi import HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from src.config import settings
+from .serializers import compile_serializer
+
+
+def id_list(
+    ids: str | None = Query(None, description="Comma-separated ids to fetch")
+) -> list[int] | None:
+    if ids is None:
+        return None
+    try:
+        # Duplicates are dropped, the first occurrence keeps its position
+        values = list(dict.fromkeys(int(value) for value in ids.split(",")))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid ids")
+    if len(values) > settings.BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400, detail=f"Pass at most {settings.BATCH_MAX_IDS} ids"
+        )
+    return values
+
+
+def respond_many(
+    schema: type[BaseModel],
+    ids: Sequence[int],
+    items: Sequence,
+    name: str,
+    exclude: frozenset[str] = frozenset(),
+) -> ORJSONResponse:
+    serializer = compile_serializer(schema, exclude)
+    found = {item.id: item for item in items}
+    return ORJSONResponse(
+        [
+            serializer(found[item_id])
+            if item_id in found
+            else {"id": item_id, "detail": f"{name} not found"}
+            for item_id in ids
+        ]
+    )
@@ -0,0 +1,71 @@
+from typing import Iterable
+from fastapi.responses import Response
+from redis.exceptions import WatchError
+from src.config import settings
+from .metrics import CACHE_LOOKUPS
+from .redis import RedisClient
+
+
+class ResponseCache:
+    def __init__(self, namespace: str, ttl: int):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def key(self, resource_id: int) -> str:
+        return f"cache:{self.namespace}:{resource_id}"
+
+    def version_key(self, resource_id: int) -> str:
+        return f"cache:{self.namespace}:{resource_id}:version"
+
+    async def get(self, resource_id: int) -> tuple[tuple[str, str] | None, str]:
+        # The version is handed back to `set`, so a body rendered from rows
+        # read before a concurrent invalidation is never written back
+        entry, version = await RedisClient().aconn.mget(
+            self.key(resource_id), self.version_key(resource_id)
+        )
+        if entry is None:
+            CACHE_LOOKUPS.labels(self.namespace, "miss").inc()
+            return None, version or "0"
+        CACHE_LOOKUPS.labels(self.namespace, "hit").inc()
+        etag, body = entry.split("\n", 1)
+        return (etag, body), version or "0"
+
+    async def set(self, resource_id: int, etag: str, body: bytes, version: str) -> None:
+        version_key = self.version_key(resource_id)
+        async with RedisClient().aconn.pipeline() as pipe:
+            try:
+                await pipe.watch(version_key)
+                if (await pipe.get(version_key) or "0") != version:
+                    return
+                pipe.multi()
+                # Rendered JSON never contains a raw newline
+                pipe.set(
+                    self.key(resource_id), etag.encode() + b"\n" + body, ex=self.ttl
+                )
+                await pipe.execute()
+            except WatchError:
+                pass
+
+    async def invalidate(self, resource_ids: Iterable[int]) -> None:
+        resource_ids = set(resource_ids)
+        if not resource_ids:
+            return
+        async with RedisClient().aconn.pipeline(transaction=False) as pipe:
+            for resource_id in resource_ids:
+                pipe.incr(self.version_key(resource_id))
+                # Outlives any in-flight read of the previous version
+                pipe.expire(self.version_key(resource_id), self.ttl * 10)
+            pipe.delete(*(self.key(resource_id) for resource_id in resource_ids))
+            await pipe.execute()
+
+
+def cached_response(etag: str, body: str | bytes, hit: bool) -> Response:
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "X-Cache": "HIT" if hit else "MISS"},
+    )
+
+
+summary_cache = ResponseCache("summary", settings.CACHE_TTL)
+user_cache = ResponseCache("user", settings.CACHE_TTL)
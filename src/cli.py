@@ -0,0 +1,74 @@
+import argparse
+import asyncio
+import json
+import sys
+from typing import AsyncIterable, BinaryIO
+from src.config import settings
+from src.db import session_manager
+from src.redis import RedisClient
+from src.services import counters
+from src.services.importer import import_comments, import_summaries
+
+
+IMPORTERS = {"summaries": import_summaries, "comments": import_comments}
+
+
+async def read_lines(file: BinaryIO) -> AsyncIterable[bytes]:
+    for line in file:
+        yield line
+
+
+async def import_file(table: str, path: str) -> dict:
+    session_manager.init(settings.DB_URL)
+    # Imported rows invalidate cached responses
+    RedisClient(settings.REDIS_HOST, settings.REDIS_PASSWORD)
+    try:
+        async with session_manager.session() as db:
+            if path == "-":
+                return await IMPORTERS[table](db, read_lines(sys.stdin.buffer))
+            with open(path, "rb") as file:
+                return await IMPORTERS[table](db, read_lines(file))
+    finally:
+        await RedisClient().close()
+        await session_manager.close()
+
+
+async def backfill_counters() -> dict:
+    session_manager.init(settings.DB_URL)
+    RedisClient(settings.REDIS_HOST, settings.REDIS_PASSWORD)
+    try:
+        async with session_manager.session() as db:
+            return await counters.backfill(db)
+    finally:
+        await RedisClient().close()
+        await session_manager.close()
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(prog="python -m src.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser(
+        "import", help="bulk load NDJSON rows into summaries or comments"
+    )
+    import_parser.add_argument("table", choices=IMPORTERS)
+    import_parser.add_argument("path", help="NDJSON file, '-' for stdin")
+
+    commands.add_parser(
+        "backfill-counters",
+        help="recount comments and summaries stored on summaries and users",
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == "import":
+        report = asyncio.run(import_file(args.table, args.path))
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+        if report["failed"]:
+            sys.exit(1)
+    elif args.command == "backfill-counters":
+        fixed = asyncio.run(backfill_counters())
+        print(json.dumps(fixed, indent=2))
+
+
+if __name__ == "__main__":
+    main()
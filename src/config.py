@@ -1,3 +1,4 @@
+from typing import Literal
 from pydantic import BaseSettings
 
 
@@ -8,6 +9,15 @@ class Settings(BaseSettings):
     DB_NAME: str
     DB_PORT: int
     DB_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = False
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_STATEMENT_TIMEOUT: int = 0
+    DB_QUERY_BUDGET: int = 0
+    DB_SLOW_QUERIES: int = 3
     AUTHJWT_SECRET_KEY: str
     AUTHJWT_DENYLIST_ENABLED: bool
     AUTHJWT_DENYLIST_TOKEN_CHECKS: set = {"access", "refresh"}
@@ -15,6 +25,19 @@ class Settings(BaseSettings):
     AUTHJWT_REFRESH_TOKEN_EXPIRES: int
     REDIS_HOST: str
     REDIS_PASSWORD: str
+    CACHE_TTL: int = 60
+    PAGINATION_DEFAULT_LIMIT: int = 50
+    PAGINATION_MAX_LIMIT: int = 500
+    AUTOCOMPLETE_DEFAULT_LIMIT: int = 10
+    AUTOCOMPLETE_MAX_LIMIT: int = 25
+    BATCH_MAX_IDS: int = 100
+    EXPORT_BATCH_SIZE: int = 1000
+    IMPORT_BATCH_SIZE: int = 5000
+    IMPORT_MAX_ERRORS: int = 1000
+    PASSWORD_HASHER_EXECUTOR: Literal["thread", "process"] = "thread"
+    PASSWORD_HASHER_WORKERS: int = 4
+    PROFILE_SAMPLE_RATE: float = 0
+    PROFILE_TTL: int = 3600
 
     class Config:
         env_file = "./.env"
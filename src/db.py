@@ -1,6 +1,10 @@
 import contextlib
-from typing import AsyncIterator
+from typing import AsyncIterator, Sequence
+from sqlalchemy import ARRAY, ColumnElement, Integer, any_, bindparam
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import Pool
 from sqlalchemy.ext.asyncio import (
     AsyncEngine,
     AsyncSession,
@@ -8,18 +12,55 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
+from src.config import settings
+from .metrics import observe_pool
+from .querystats import observe_queries
 
 Base = declarative_base()
 
 
+def pool_state(pool: Pool) -> dict[str, int]:
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
 class DatabaseSessionManager:
     def __init__(self):
         self._engine: AsyncEngine | None = None
         self._session_maker: async_sessionmaker | None = None
 
     def init(self, host: str):
-        self._engine = create_async_engine(host)
-        self._session_maker = async_sessionmaker(bind=self._engine, autocommit=False)
+        connect_args = {}
+        if make_url(host).get_driver_name() == "asyncpg":
+            connect_args[
+                "prepared_statement_cache_size"
+            ] = settings.DB_STATEMENT_CACHE_SIZE
+            if settings.DB_STATEMENT_TIMEOUT:
+                # Milliseconds, enforced by the server for every statement
+                connect_args["server_settings"] = {
+                    "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT)
+                }
+
+        self._engine = create_async_engine(
+            host,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING,
+            connect_args=connect_args,
+        )
+        self._session_maker = async_sessionmaker(
+            bind=self._engine, autocommit=False, expire_on_commit=False
+        )
+        pool = self._engine.sync_engine.pool
+        # Bound to this pool, so late events after close() still read it
+        observe_pool(pool, lambda: pool_state(pool))
+        observe_queries(self._engine.sync_engine)
 
     @contextlib.asynccontextmanager
     async def connect(self) -> AsyncIterator[AsyncConnection]:
@@ -33,6 +74,12 @@ class DatabaseSessionManager:
                 await connection.rollback()
                 raise
 
+    def pool_stats(self) -> dict[str, int]:
+        if self._engine is None:
+            raise Exception("DatabaseSessionManager is not initialized")
+
+        return pool_state(self._engine.pool)
+
     async def close(self):
         if self._engine is None:
             raise Exception("DatabaseSessionManager is not initialized")
@@ -65,6 +112,16 @@ class DatabaseSessionManager:
 session_manager = DatabaseSessionManager()
 
 
+def violated_constraint(error: IntegrityError) -> str | None:
+    # asyncpg reports the constraint on the driver exception behind the DBAPI one
+    return getattr(error.orig.__cause__, "constraint_name", None)
+
+
+def any_of(column, ids: Sequence[int]) -> ColumnElement[bool]:
+    # One array parameter, so the statement text doesn't vary with len(ids)
+    return column == any_(bindparam("ids", list(ids), type_=ARRAY(Integer)))
+
+
 async def get_db():
     async with session_manager.session() as session:
         yield session
@@ -0,0 +1,41 @@
+from contextvars import ContextVar
+from fastapi import Request
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.exceptions import AuthJWTException
+from src.config import settings
+from .redis import RedisClient
+
+
+# Denylist entries fetched for the current request, keyed by token jti
+revoked_tokens: ContextVar[dict[str, bool] | None] = ContextVar(
+    "revoked_tokens", default=None
+)
+
+
+@AuthJWT.token_in_denylist_loader
+def check_if_token_in_denylist(decrypted_token: dict) -> bool:
+    entries = revoked_tokens.get()
+    if entries is None or decrypted_token["jti"] not in entries:
+        # The entry was not prefetched by load_denylist, so the token is refused
+        return True
+    return entries[decrypted_token["jti"]]
+
+
+async def load_denylist(request: Request) -> None:
+    entries = {}
+    revoked_tokens.set(entries)
+    if not settings.AUTHJWT_DENYLIST_ENABLED:
+        return
+
+    try:
+        raw_token = AuthJWT(req=request).get_raw_jwt()
+    except AuthJWTException:
+        return
+
+    if raw_token and raw_token["type"] in settings.AUTHJWT_DENYLIST_TOKEN_CHECKS:
+        entry = await RedisClient().aconn.get(raw_token["jti"])
+        entries[raw_token["jti"]] = entry == "true"
+
+
+async def revoke_token(jti: str, expires: int) -> None:
+    await RedisClient().aconn.setex(jti, expires, "true")
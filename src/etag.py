@@ -0,0 +1,24 @@
+import hashlib
+from fastapi import Request, Response
+
+
+def make_etag(*versions: tuple) -> str:
+    digest = hashlib.blake2b(repr(versions).encode(), digest_size=16).hexdigest()
+    return f'"{digest}"'
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers
+
+
+def is_fresh(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
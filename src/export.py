@@ -0,0 +1,64 @@
+import csv
+import io
+from datetime import datetime
+from decimal import Decimal
+from typing import AsyncIterator, Literal
+import orjson
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncResult
+
+
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _plain(value):
+    return value.isoformat() if isinstance(value, datetime) else value
+
+
+def _default(value):
+    # orjson writes dates and datetimes itself, in the same form as
+    # isoformat(); numeric columns come back as Decimal, which it doesn't know
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+
+async def ndjson_chunks(result: AsyncResult) -> AsyncIterator[bytes]:
+    columns = list(result.keys())
+    async for rows in result.partitions():
+        yield b"".join(
+            orjson.dumps(
+                dict(zip(columns, row)),
+                default=_default,
+                option=orjson.OPT_APPEND_NEWLINE,
+            )
+            for row in rows
+        )
+
+
+async def csv_chunks(result: AsyncResult) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(result.keys())
+    yield buffer.getvalue().encode()
+
+    async for rows in result.partitions():
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([map(_plain, row) for row in rows])
+        yield buffer.getvalue().encode()
+
+
+def export_response(
+    result: AsyncResult, export_format: ExportFormat, name: str
+) -> StreamingResponse:
+    chunks = ndjson_chunks if export_format == "ndjson" else csv_chunks
+    return StreamingResponse(
+        chunks(result),
+        media_type=MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="{name}.{export_format}"'
+        },
+    )
@@ -0,0 +1,57 @@
+from typing import Callable
+from fastapi import HTTPException, Query
+from pydantic import BaseModel
+from .etag import make_etag
+
+
+def relations_of(schema: type[BaseModel]) -> tuple[str, ...]:
+    return tuple(
+        name
+        for name, field in schema.__fields__.items()
+        if isinstance(field.type_, type) and issubclass(field.type_, BaseModel)
+    )
+
+
+def parse_names(value: str | None, allowed: tuple[str, ...], kind: str) -> tuple:
+    if value is None:
+        return allowed
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = names.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown {kind}: {', '.join(sorted(unknown))}",
+        )
+    # Schema order, so equal selections share one serializer and ETag
+    return tuple(name for name in allowed if name in names)
+
+
+class FieldSet:
+    def __init__(
+        self, schema: type[BaseModel], fields: str | None, include: str | None
+    ):
+        relations = relations_of(schema)
+        columns = tuple(name for name in schema.__fields__ if name not in relations)
+        self.fields = parse_names(fields, columns, "field")
+        self.include = parse_names(include, relations, "relation")
+        self.sparse = self.fields != columns or self.include != relations
+        self.exclude = frozenset(schema.__fields__).difference(
+            self.fields + self.include
+        )
+
+    def etag(self, *versions: tuple) -> str:
+        if not self.sparse:
+            return make_etag(*versions)
+        return make_etag((self.fields, self.include), *versions)
+
+
+def fieldset(schema: type[BaseModel]) -> Callable[..., FieldSet]:
+    def dependency(
+        fields: str
+        | None = Query(None, description="Comma-separated columns to return"),
+        include: str
+        | None = Query(None, description="Comma-separated relations to embed"),
+    ) -> FieldSet:
+        return FieldSet(schema, fields, include)
+
+    return dependency
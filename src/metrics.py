@@ -0,0 +1,130 @@
+import asyncio
+import os
+import time
+from typing import Callable
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# With several workers each process writes its samples to files in this
+# directory and /metrics merges them; it must be set before the app imports
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by route and status code",
+    ["method", "route", "status"],
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests being served",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "Database pool connections by state",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+REDIS_DURATION = Histogram(
+    "redis_command_duration_seconds",
+    "Redis round trips by command",
+    ["command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+CACHE_LOOKUPS = Counter(
+    "response_cache_lookups_total",
+    "Response cache lookups by namespace and result",
+    ["namespace", "result"],
+)
+PASSWORD_HASHER_TASKS = Gauge(
+    "password_hasher_tasks",
+    "Password hashing calls waiting for or running in the executor",
+    ["state"],
+    multiprocess_mode="livesum",
+)
+
+
+def observe_pool(pool: Pool, stats: Callable[[], dict[str, int]]) -> None:
+    # Gauges are written as connections move rather than at scrape time, so
+    # every worker reports its own pool under the multiprocess collector
+    def update(*args) -> None:
+        for state, value in stats().items():
+            DB_POOL_CONNECTIONS.labels(state).set(value)
+
+    def update_after_checkin(*args) -> None:
+        # Checkin fires before the connection is back in the pool, which
+        # happens synchronously right after, so the pool is read on the next
+        # loop iteration instead
+        try:
+            asyncio.get_running_loop().call_soon(update)
+        except RuntimeError:
+            update()
+
+    for name in ("connect", "checkout", "close"):
+        event.listen(pool, name, update)
+    event.listen(pool, "checkin", update_after_checkin)
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_flight.dec()
+            # The route template set by the router, raw paths would blow up
+            # the number of series
+            route = scope.get("route")
+            path = route.path if route is not None else "unmatched"
+            REQUEST_DURATION.labels(method, path).observe(elapsed)
+            REQUESTS.labels(method, path, str(status)).inc()
+
+
+def render() -> tuple[bytes, str]:
+    if not MULTIPROCESS:
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def shutdown() -> None:
+    if MULTIPROCESS:
+        # Drops this worker's live gauges from the merged output
+        multiprocess.mark_process_dead(os.getpid())
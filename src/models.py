@@ -1,20 +1,37 @@
 from src.db import Base
 from sqlalchemy import (
+    DDL,
     Column,
+    Computed,
     String,
     DateTime,
     Integer,
     func,
     ForeignKey,
-    select,
-    column,
-    text,
+    Index,
+    event,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
+
+# Text search configuration of Summary.search_vector, queries must use the same
+SEARCH_CONFIG = "simple"
+SEARCH_DOCUMENT = (
+    f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(title, '')), 'A')"
+    f" || setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(description, '')), 'B')"
 )
-from sqlalchemy.orm import relationship
 
 
 class User(Base):
     __tablename__ = "users"
+    __table_args__ = (
+        Index(
+            "ix_users_username_trgm",
+            "username",
+            postgresql_using="gin",
+            postgresql_ops={"username": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     username = Column(String, unique=True, nullable=False, index=True)
@@ -25,20 +42,16 @@ class User(Base):
         DateTime(timezone=True), default=func.now(), onupdate=func.now()
     )
     fio = Column(String)
-    role_id = Column(
-        Integer,
-        ForeignKey("roles.id"),
-        default=select(column("id"))
-        .where(column("name") == "user")
-        .select_from(text("roles")),
-    )
+    summary_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    role_id = Column(Integer, ForeignKey("roles.id"))
     role = relationship("Role", back_populates="users", lazy="joined")
     summaries = relationship(
         "Summary",
         back_populates="user",
         cascade="all, delete",
         passive_deletes=True,
-        lazy="selectin",
+        lazy="raise_on_sql",
         order_by="Summary.id",
     )
     comments = relationship(
@@ -46,7 +59,7 @@ class User(Base):
         back_populates="user",
         cascade="all, delete",
         passive_deletes=True,
-        lazy="selectin",
+        lazy="raise_on_sql",
         order_by="Comment.id",
     )
 
@@ -62,28 +75,46 @@ class Role(Base):
 
 class Summary(Base):
     __tablename__ = "summaries"
+    __table_args__ = (
+        Index("ix_summaries_user_id_id", "user_id", "id"),
+        Index("ix_summaries_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_summaries_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False, index=True)
     description = Column(String)
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(SEARCH_DOCUMENT, persisted=True))
+    )
     created_at = Column(DateTime(timezone=True), default=func.now())
     updated_at = Column(
         DateTime(timezone=True), default=func.now(), onupdate=func.now()
     )
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
-    user = relationship("User", back_populates="summaries", lazy="joined")
+    user = relationship("User", back_populates="summaries", lazy="raise_on_sql")
     comments = relationship(
         "Comment",
         back_populates="summary",
         cascade="all, delete",
         passive_deletes=True,
-        lazy="selectin",
+        lazy="raise_on_sql",
         order_by="Comment.id",
     )
 
 
 class Comment(Base):
     __tablename__ = "comments"
+    __table_args__ = (
+        Index("ix_comments_user_id_id", "user_id", "id"),
+        Index("ix_comments_summary_id_id", "summary_id", "id"),
+    )
 
     id = Column(Integer, primary_key=True)
     created_at = Column(DateTime(timezone=True), default=func.now())
@@ -93,5 +124,75 @@ class Comment(Base):
     text = Column(String, nullable=False)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"))
     summary_id = Column(Integer, ForeignKey("summaries.id", ondelete="CASCADE"))
-    user = relationship("User", back_populates="comments", lazy="joined")
-    summary = relationship("Summary", back_populates="comments", lazy="joined")
+    user = relationship("User", back_populates="comments", lazy="raise_on_sql")
+    summary = relationship("Summary", back_populates="comments", lazy="raise_on_sql")
+
+
+# The trigram operator classes come from pg_trgm, it has to exist before tables
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+# The counter columns are kept by statement-level triggers, so multi-row
+# inserts, COPY and ON DELETE CASCADE adjust each parent row once per statement.
+# Both triggers of a table name their transition table "changed".
+COUNTER_DDL = (
+    """
+    CREATE OR REPLACE FUNCTION count_summaries() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        sign integer := CASE TG_OP WHEN 'INSERT' THEN 1 ELSE -1 END;
+    BEGIN
+        UPDATE users SET summary_count = summary_count + sign * d.n
+        FROM (SELECT user_id, count(*) AS n FROM changed GROUP BY user_id) AS d
+        WHERE users.id = d.user_id;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION count_comments() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    DECLARE
+        sign integer := CASE TG_OP WHEN 'INSERT' THEN 1 ELSE -1 END;
+    BEGIN
+        UPDATE summaries SET comment_count = comment_count + sign * d.n
+        FROM (SELECT summary_id, count(*) AS n FROM changed GROUP BY summary_id) AS d
+        WHERE summaries.id = d.summary_id;
+        UPDATE users SET comment_count = comment_count + sign * d.n
+        FROM (SELECT user_id, count(*) AS n FROM changed GROUP BY user_id) AS d
+        WHERE users.id = d.user_id;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE TRIGGER summaries_count_insert AFTER INSERT ON summaries
+    REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION count_summaries()
+    """,
+    """
+    CREATE TRIGGER summaries_count_delete AFTER DELETE ON summaries
+    REFERENCING OLD TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION count_summaries()
+    """,
+    """
+    CREATE TRIGGER comments_count_insert AFTER INSERT ON comments
+    REFERENCING NEW TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION count_comments()
+    """,
+    """
+    CREATE TRIGGER comments_count_delete AFTER DELETE ON comments
+    REFERENCING OLD TABLE AS changed
+    FOR EACH STATEMENT EXECUTE FUNCTION count_comments()
+    """,
+)
+
+for statement in COUNTER_DDL:
+    event.listen(
+        Base.metadata,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql"),
+    )
@@ -0,0 +1,134 @@
+import base64
+import binascii
+import math
+from typing import Sequence
+from fastapi import HTTPException, Query, Request, Response
+from sqlalchemy import ColumnElement, Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+from src.config import settings
+
+
+def encode_cursor(value: int | str) -> str:
+    return base64.urlsafe_b64encode(str(value).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def encode_ranked_cursor(rank: float, value: int) -> str:
+    return encode_cursor(f"{rank!r}:{value}")
+
+
+def decode_ranked_cursor(cursor: str) -> tuple[float, int]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        rank, value = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+        rank = float(rank)
+        if not math.isfinite(rank):
+            raise ValueError(rank)
+        return rank, int(value)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def keyset(
+    stmt: Select,
+    column: InstrumentedAttribute,
+    bound: int | None = None,
+    after: int | None = None,
+    before: int | None = None,
+) -> Select:
+    if after is not None:
+        stmt = stmt.where(column > after)
+    if before is not None:
+        # Walk backwards from the cursor, callers reverse the fetched rows
+        return stmt.where(column < before).order_by(column.desc()).limit(bound)
+    return stmt.order_by(column).limit(bound)
+
+
+def ranked_keyset(
+    stmt: Select,
+    rank: ColumnElement,
+    column: InstrumentedAttribute,
+    bound: int | None = None,
+    after: tuple[float, int] | None = None,
+) -> Select:
+    if after is not None:
+        stmt = stmt.where(tuple_(rank, column) < tuple_(*after))
+    return stmt.order_by(rank.desc(), column.desc()).limit(bound)
+
+
+class Pagination:
+    def __init__(
+        self,
+        limit: int = Query(
+            settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT
+        ),
+        after: str | None = None,
+        before: str | None = None,
+    ):
+        if after is not None and before is not None:
+            raise HTTPException(
+                status_code=400, detail="Use either 'after' or 'before' cursor"
+            )
+        self.limit = limit
+        self.after = decode_cursor(after) if after is not None else None
+        self.before = decode_cursor(before) if before is not None else None
+
+    def set_link_header(
+        self, request: Request, response: Response, items: Sequence
+    ) -> None:
+        links = []
+        if items and (self.before is not None or len(items) == self.limit):
+            url = request.url.remove_query_params(["after", "before"])
+            next_url = url.include_query_params(after=encode_cursor(items[-1].id))
+            links.append(f'<{next_url}>; rel="next"')
+        if items and (
+            self.after is not None
+            or (self.before is not None and len(items) == self.limit)
+        ):
+            url = request.url.remove_query_params(["after", "before"])
+            prev_url = url.include_query_params(before=encode_cursor(items[0].id))
+            links.append(f'<{prev_url}>; rel="prev"')
+        if links:
+            response.headers["Link"] = ", ".join(links)
+
+
+class RankedPagination:
+    # Forward-only paging over results ordered by (rank DESC, id DESC)
+    def __init__(
+        self,
+        limit: int = Query(
+            settings.PAGINATION_DEFAULT_LIMIT, ge=1, le=settings.PAGINATION_MAX_LIMIT
+        ),
+        after: str | None = None,
+    ):
+        self.limit = limit
+        self.after = decode_ranked_cursor(after) if after is not None else None
+
+    def set_link_header(
+        self, request: Request, response: Response, items: Sequence
+    ) -> None:
+        if len(items) == self.limit:
+            cursor = encode_ranked_cursor(items[-1].rank, items[-1].id)
+            next_url = request.url.include_query_params(after=cursor)
+            response.headers["Link"] = f'<{next_url}>; rel="next"'
+
+
+class AutocompletePagination(RankedPagination):
+    # Typeahead pages stay small, the client asks again on the next keystroke
+    def __init__(
+        self,
+        limit: int = Query(
+            settings.AUTOCOMPLETE_DEFAULT_LIMIT,
+            ge=1,
+            le=settings.AUTOCOMPLETE_MAX_LIMIT,
+        ),
+        after: str | None = None,
+    ):
+        super().__init__(limit, after)
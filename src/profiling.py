@@ -0,0 +1,144 @@
+import base64
+import cProfile
+import io
+import json
+import logging
+import marshal
+import pstats
+import random
+import time
+from uuid import uuid4
+from fastapi import HTTPException, Request
+from fastapi_jwt_auth import AuthJWT
+from fastapi_jwt_auth.exceptions import AuthJWTException
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.config import settings
+from .denylist import load_denylist
+from .redis import RedisClient
+from .security import admin_required
+
+# Admins send this header to have a single request profiled
+PROFILE_HEADER = "x-profile"
+# Newest first, older entries stay retrievable until their key expires
+PROFILE_INDEX = "profiles"
+PROFILE_INDEX_SIZE = 100
+
+logger = logging.getLogger(__name__)
+
+
+def profile_key(profile_id: str) -> str:
+    return f"profile:{profile_id}"
+
+
+class _LoadedStats:
+    # The shape pstats.Stats accepts besides a file name
+    def __init__(self, stats: dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+def load_stats(raw: bytes, stream: io.StringIO | None = None) -> pstats.Stats:
+    return pstats.Stats(_LoadedStats(marshal.loads(raw)), stream=stream)
+
+
+async def save_profile(profile_id: str, profiler: cProfile.Profile, meta: dict):
+    profiler.create_stats()
+    entry = {**meta, "stats": base64.b64encode(marshal.dumps(profiler.stats)).decode()}
+    async with RedisClient().aconn.pipeline(transaction=False) as pipe:
+        pipe.set(profile_key(profile_id), json.dumps(entry), ex=settings.PROFILE_TTL)
+        pipe.lpush(PROFILE_INDEX, json.dumps(meta))
+        pipe.ltrim(PROFILE_INDEX, 0, PROFILE_INDEX_SIZE - 1)
+        await pipe.execute()
+
+
+async def list_profiles() -> list[dict]:
+    return [
+        json.loads(meta)
+        for meta in await RedisClient().aconn.lrange(PROFILE_INDEX, 0, -1)
+    ]
+
+
+async def get_profile(profile_id: str) -> tuple[dict, bytes] | None:
+    entry = await RedisClient().aconn.get(profile_key(profile_id))
+    if entry is None:
+        return None
+    meta = json.loads(entry)
+    return meta, base64.b64decode(meta.pop("stats"))
+
+
+def render_profile(raw: bytes, sort: str, limit: int) -> str:
+    stream = io.StringIO()
+    load_stats(raw, stream).sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+async def is_admin(request: Request) -> bool:
+    # The route's own dependencies haven't run yet, so the denylist is
+    # prefetched here for the token check
+    await load_denylist(request)
+    try:
+        admin_required(AuthJWT(req=request))
+    except (AuthJWTException, HTTPException):
+        return False
+    return True
+
+
+class ProfilerMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        # cProfile follows the event loop thread, one profile at a time. That
+        # doesn't keep other requests out of it: whatever their coroutines run
+        # on the loop while this one awaits is counted in its profile too
+        self.busy = False
+
+    async def wanted(self, scope: Scope) -> bool:
+        request = Request(scope)
+        if PROFILE_HEADER in request.headers:
+            return await is_admin(request)
+        return random.random() < settings.PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # busy is read after the await, so two requests can't both start
+        if scope["type"] != "http" or not await self.wanted(scope) or self.busy:
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid4().hex
+        status = 500
+
+        async def send_profile_id(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        self.busy = True
+        profiler = cProfile.Profile()
+        started, wall, cpu = time.time(), time.perf_counter(), time.thread_time()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send_profile_id)
+        finally:
+            profiler.disable()
+            wall, cpu = time.perf_counter() - wall, time.thread_time() - cpu
+            self.busy = False
+            meta = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "started_at": started,
+                # Loop thread CPU; time in executors (bcrypt) shows as wall only
+                "wall_ms": round(wall * 1000, 1),
+                "cpu_ms": round(cpu * 1000, 1),
+            }
+            # The response is already out, a Redis failure mustn't surface
+            # after it or replace an exception the app raised
+            try:
+                await save_profile(profile_id, profiler, meta)
+            except Exception:
+                logger.exception("Couldn't save profile %s", profile_id)
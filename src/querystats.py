@@ -0,0 +1,116 @@
+import json
+import logging
+import time
+from contextvars import ContextVar
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryStats:
+    def __init__(self, budget: int | None = None, keep: int = 3):
+        self.budget = budget
+        self.keep = keep
+        self.count = 0
+        self.duration = 0.0
+        self.slowest: list[tuple[float, str]] = []
+
+    def check(self, statement: str) -> None:
+        if self.budget is not None and self.count >= self.budget:
+            raise QueryBudgetExceeded(
+                f"Query {self.count + 1} exceeds the budget of {self.budget}: "
+                f"{statement}"
+            )
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.duration += elapsed
+        if len(self.slowest) < self.keep or elapsed > self.slowest[-1][0]:
+            self.slowest.append((elapsed, statement))
+            self.slowest.sort(key=lambda item: item[0], reverse=True)
+            del self.slowest[self.keep :]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.duration * 1000:.1f};desc="{self.count} queries"'
+
+    def dict(self) -> dict:
+        return {
+            "queries": self.count,
+            "db_ms": round(self.duration * 1000, 1),
+            "slowest": [
+                {"ms": round(elapsed * 1000, 1), "statement": statement[:500]}
+                for elapsed, statement in self.slowest
+            ],
+        }
+
+
+# Statistics of the request being served, None outside of requests
+current_stats: ContextVar[QueryStats | None] = ContextVar("current_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    stats = current_stats.get()
+    if stats is not None:
+        stats.check(statement)
+    context.query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    elapsed = time.perf_counter() - context.query_started
+    stats = current_stats.get()
+    if stats is not None:
+        stats.record(statement, elapsed)
+
+
+def observe_queries(engine: Engine) -> None:
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Read per request so tests can tighten the budget at any time
+        stats = QueryStats(settings.DB_QUERY_BUDGET or None, settings.DB_SLOW_QUERIES)
+        status = 500
+
+        async def send_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # Streamed bodies may still query, the header covers what ran so far
+                MutableHeaders(scope=message).append(
+                    "Server-Timing", stats.server_timing()
+                )
+            await send(message)
+
+        token = current_stats.set(stats)
+        try:
+            await self.app(scope, receive, send_timing)
+        finally:
+            current_stats.reset(token)
+            if stats.count:
+                logger.info(
+                    json.dumps(
+                        {
+                            "method": scope["method"],
+                            "path": scope["path"],
+                            "status": status,
+                            **stats.dict(),
+                        }
+                    )
+                )
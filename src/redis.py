@@ -1,4 +1,7 @@
+import time
 import redis
+import redis.asyncio as aioredis
+from .metrics import REDIS_DURATION
 
 
 class Singleton(type):
@@ -10,9 +13,45 @@ class Singleton(type):
         return cls._instances[cls]
 
 
+class TimedPipeline(aioredis.client.Pipeline):
+    async def immediate_execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().immediate_execute_command(*args, **options)
+        finally:
+            REDIS_DURATION.labels(args[0]).observe(time.perf_counter() - start)
+
+    async def execute(self, raise_on_error: bool = True):
+        command = (
+            "MULTI" if self.is_transaction or self.explicit_transaction else "PIPELINE"
+        )
+        start = time.perf_counter()
+        try:
+            return await super().execute(raise_on_error)
+        finally:
+            REDIS_DURATION.labels(command).observe(time.perf_counter() - start)
+
+
+class TimedRedis(aioredis.Redis):
+    async def execute_command(self, *args, **options):
+        start = time.perf_counter()
+        try:
+            return await super().execute_command(*args, **options)
+        finally:
+            REDIS_DURATION.labels(args[0]).observe(time.perf_counter() - start)
+
+    def pipeline(self, transaction: bool = True, shard_hint: str | None = None):
+        return TimedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
 class RedisClient(metaclass=Singleton):
     def __init__(self, host="localhost", password=None):
         self.pool = redis.ConnectionPool(host=host, password=password)
+        self.async_pool = aioredis.ConnectionPool(
+            host=host, password=password, decode_responses=True
+        )
 
     @property
     def conn(self):
@@ -20,11 +59,21 @@ class RedisClient(metaclass=Singleton):
             self.get_connection()
         return self._conn
 
+    @property
+    def aconn(self):
+        if not hasattr(self, "_aconn"):
+            self.get_async_connection()
+        return self._aconn
+
     def get_connection(self):
         self._conn = redis.Redis(connection_pool=self.pool, decode_responses=True)
 
+    def get_async_connection(self):
+        self._aconn = TimedRedis(connection_pool=self.async_pool)
+
+    async def close(self):
+        await self.async_pool.disconnect()
+
     # For testing
     def clear(self):
-        if not hasattr(self, "_conn"):
-            raise Exception("RedisClient is not initialized")
-        self._conn.flushdb()
+        self.conn.flushdb()
@@ -5,11 +5,12 @@ from ..schemas.auth import AuthSchemaIn, AuthSchemaOut, RefreshAccessToken
 from sqlalchemy.ext.asyncio import AsyncSession
 from ..db import get_db
 from ..services.user import get_with_paswd, get_by_id
-from ..redis import RedisClient
+from ..denylist import load_denylist, revoke_token
 
 
-auth_router = APIRouter(prefix="/auth", tags=["Authentication"])
-redis_conn = RedisClient().conn
+auth_router = APIRouter(
+    prefix="/auth", tags=["Authentication"], dependencies=[Depends(load_denylist)]
+)
 
 
 @AuthJWT.load_config
@@ -17,13 +18,6 @@ def get_config():
     return settings
 
 
-@AuthJWT.token_in_denylist_loader
-def check_if_token_in_denylist(decrypted_token: str) -> bool:
-    jti = decrypted_token["jti"]
-    entry = redis_conn.get(jti)
-    return entry and entry == "true"
-
-
 @auth_router.post("/login", response_model=AuthSchemaOut)
 async def login(
     user_data: AuthSchemaIn,
@@ -50,14 +44,14 @@ async def refresh_access_token(
 ):
     authorize.jwt_refresh_token_required()
     user_claims = {"user_claims": authorize.get_raw_jwt()["user_claims"]}
-    current_user = await get_by_id(db, user_claims["user_claims"]["id"])
+    current_user = await get_by_id(db, user_claims["user_claims"]["id"], load="bare")
     jti = authorize.get_raw_jwt()["jti"]
 
     new_access_token = authorize.create_access_token(
         subject=current_user.username, user_claims=user_claims
     )
 
-    redis_conn.setex(jti, settings.AUTHJWT_REFRESH_TOKEN_EXPIRES, "true")
+    await revoke_token(jti, settings.AUTHJWT_REFRESH_TOKEN_EXPIRES)
     return {"access_token": new_access_token}
 
 
@@ -65,5 +59,5 @@ async def refresh_access_token(
 async def logout(authorize: AuthJWT = Depends()):
     authorize.jwt_required()
     jti = authorize.get_raw_jwt()["jti"]
-    redis_conn.setex(jti, settings.AUTHJWT_ACCESS_TOKEN_EXPIRES, "true")
+    await revoke_token(jti, settings.AUTHJWT_ACCESS_TOKEN_EXPIRES)
     return {"detail": "Tokens has been revoked"}
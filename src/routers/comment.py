@@ -1,35 +1,224 @@
-from fastapi import APIRouter, Depends, HTTPException
-from ..schemas.comment import CommentSchema, CommentSchemaCreate, CommentSchemaUpdate
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from ..schemas.comment import (
+    CommentSchema,
+    CommentSchemaBatchUpdate,
+    CommentSchemaCreate,
+    CommentSchemaUpdate,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from ..batch import id_list, respond_many
 from ..db import get_db
-from ..services.comment import create, update, delete, get_by_id, get_all
+from ..etag import is_conditional, is_fresh, not_modified
+from ..denylist import load_denylist
+from ..fieldsets import FieldSet, fieldset
+from ..pagination import Pagination
+from src.config import settings
+from ..export import ExportFormat, export_response
+from ..security import admin_required
+from ..serializers import respond, serialize
+from ..services.importer import import_comments, iter_lines
+from ..services.comment import (
+    create,
+    create_many,
+    update,
+    update_many,
+    delete,
+    delete_many,
+    get_owners,
+    get_by_id,
+    get_all,
+    get_many,
+    get_version,
+    get_versions,
+    sparse,
+    stream_all,
+    version,
+)
 from fastapi_jwt_auth import AuthJWT
 
 
-comments_router = APIRouter(prefix="/comments", tags=["Comments"])
+comment_fields = fieldset(CommentSchema)
+
+comments_router = APIRouter(
+    prefix="/comments", tags=["Comments"], dependencies=[Depends(load_denylist)]
+)
 
 
 @comments_router.get("", response_model=list[CommentSchema])
 async def get_comments(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    page: Pagination = Depends(),
+    selection: FieldSet = Depends(comment_fields),
+    ids: list[int] | None = Depends(id_list),
+    authorize: AuthJWT = Depends(),
+):
+    authorize.jwt_required()
+    load = sparse(selection.fields, selection.include) if selection.sparse else "full"
+    if ids is not None:
+        comments = await get_many(db, ids, load)
+        return respond_many(CommentSchema, ids, comments, "Comment", selection.exclude)
+
+    etag = None
+    if is_conditional(request) or selection.sparse:
+        versions = await get_versions(db, page.limit, page.after, page.before)
+        etag = selection.etag(*versions)
+        if is_fresh(request, etag):
+            return not_modified(etag)
+
+    comments = await get_all(db, page.limit, page.after, page.before, load)
+    page.set_link_header(request, response, comments)
+    response.headers["ETag"] = etag or selection.etag(*map(version, comments))
+    return respond(CommentSchema, comments, response, exclude=selection.exclude)
+
+
+@comments_router.get("/export")
+async def export_comments(
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    db: AsyncSession = Depends(get_db),
+    authorize: AuthJWT = Depends(),
+):
+    authorize.jwt_required()
+    return export_response(await stream_all(db), export_format, "comments")
+
+
+@comments_router.post("/import")
+async def import_comments_ndjson(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    authorize: AuthJWT = Depends(),
+):
+    admin_required(authorize)
+    return await import_comments(db, iter_lines(request.stream()))
+
+
+@comments_router.post("/batch")
+async def create_comments(
+    comments: list[CommentSchemaCreate] = Body(
+        min_items=1, max_items=settings.BATCH_MAX_IDS
+    ),
     db: AsyncSession = Depends(get_db),
-    limit: int | None = None,
     authorize: AuthJWT = Depends(),
 ):
     authorize.jwt_required()
-    return await get_all(db, limit)
+    user_claims = authorize.get_raw_jwt()["user_claims"]
+    owned = [comment for comment in comments if comment.user_id == user_claims["id"]]
+    created = iter(await create_many(db, owned) if owned else [])
+
+    results = []
+    for comment in comments:
+        if comment.user_id != user_claims["id"]:
+            results.append({"status": 405, "detail": "Method Not Allowed"})
+            continue
+        result = next(created)
+        if isinstance(result, str):
+            results.append({"status": 400, "detail": f"{result} not found"})
+        else:
+            results.append({"status": 201, "comment": serialize(CommentSchema, result)})
+    return results
+
+
+@comments_router.patch("/batch")
+async def update_comments(
+    payload: list[CommentSchemaBatchUpdate] = Body(
+        min_items=1, max_items=settings.BATCH_MAX_IDS
+    ),
+    db: AsyncSession = Depends(get_db),
+    authorize: AuthJWT = Depends(),
+):
+    authorize.jwt_required()
+    user_claims = authorize.get_raw_jwt()["user_claims"]
+    texts = {item.id: item.text for item in payload}
+    if len(texts) != len(payload):
+        raise HTTPException(status_code=400, detail="Duplicate ids")
+    owners = await get_owners(db, list(texts))
+    allowed = {
+        comment_id: text
+        for comment_id, text in texts.items()
+        if owners.get(comment_id) == user_claims["id"]
+    }
+    updated = {
+        comment.id: comment
+        for comment in (await update_many(db, allowed) if allowed else [])
+    }
+
+    results = []
+    for comment_id in texts:
+        if comment_id in updated:
+            comment = serialize(CommentSchema, updated[comment_id])
+            results.append({"id": comment_id, "status": 200, "comment": comment})
+        # Owned but missing from RETURNING means it was deleted in between
+        elif comment_id in owners and comment_id not in allowed:
+            results.append(
+                {"id": comment_id, "status": 405, "detail": "Method Not Allowed"}
+            )
+        else:
+            results.append(
+                {"id": comment_id, "status": 404, "detail": "Comment not found"}
+            )
+    return results
+
+
+@comments_router.delete("/batch")
+async def delete_comments(
+    ids: list[int] | None = Depends(id_list),
+    db: AsyncSession = Depends(get_db),
+    authorize: AuthJWT = Depends(),
+):
+    authorize.jwt_required()
+    user_claims = authorize.get_raw_jwt()["user_claims"]
+    if not ids:
+        raise HTTPException(status_code=400, detail="Invalid ids")
+    owners = await get_owners(db, ids)
+    allowed = {
+        comment_id for comment_id in ids if owners.get(comment_id) == user_claims["id"]
+    }
+    if allowed:
+        await delete_many(db, list(allowed))
+
+    results = []
+    for comment_id in ids:
+        if comment_id in allowed:
+            results.append({"id": comment_id, "status": 204})
+        elif comment_id in owners:
+            results.append(
+                {"id": comment_id, "status": 405, "detail": "Method Not Allowed"}
+            )
+        else:
+            results.append(
+                {"id": comment_id, "status": 404, "detail": "Comment not found"}
+            )
+    return results
 
 
 @comments_router.get("/{comment_id}", response_model=CommentSchema)
 async def get_comment(
-    comment_id: int, db: AsyncSession = Depends(get_db), authorize: AuthJWT = Depends()
+    comment_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    selection: FieldSet = Depends(comment_fields),
+    authorize: AuthJWT = Depends(),
 ):
     authorize.jwt_required()
-    comment = await get_by_id(db, comment_id)
+    etag = None
+    if is_conditional(request) or selection.sparse:
+        current = await get_version(db, comment_id)
+        if not current:
+            raise HTTPException(status_code=404, detail="Comment not found")
+        etag = selection.etag(current)
+        if is_fresh(request, etag):
+            return not_modified(etag)
+
+    load = sparse(selection.fields, selection.include) if selection.sparse else "full"
+    comment = await get_by_id(db, comment_id, load)
 
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
 
-    return comment
+    response.headers["ETag"] = etag or selection.etag(version(comment))
+    return respond(CommentSchema, comment, response, exclude=selection.exclude)
 
 
 @comments_router.post("", response_model=CommentSchema, status_code=201)
@@ -39,7 +228,7 @@ async def create_comment(
     result = await create(db, comment)
     if isinstance(result, str):
         raise HTTPException(status_code=400, detail=f"{result} not found")
-    return result
+    return respond(CommentSchema, result, status_code=201)
 
 
 @comments_router.patch("/{comment_id}", response_model=CommentSchema)
@@ -52,7 +241,7 @@ async def update_comment(
     authorize.jwt_required()
     user_claims = authorize.get_raw_jwt()["user_claims"]
     new_comment_data = payload.dict()
-    comment = await get_by_id(db, comment_id)
+    comment = await get_by_id(db, comment_id, load="bare")
 
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
@@ -63,7 +252,7 @@ async def update_comment(
     if not any(new_comment_data.values()):
         raise HTTPException(status_code=400)
 
-    return await update(db, payload, comment)
+    return respond(CommentSchema, await update(db, payload, comment))
 
 
 @comments_router.delete("/{comment_id}", status_code=204)
@@ -72,7 +261,7 @@ async def delete_comment(
 ):
     authorize.jwt_required()
     user_claims = authorize.get_raw_jwt()["user_claims"]
-    comment = await get_by_id(db, comment_id)
+    comment = await get_by_id(db, comment_id, load="bare")
 
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Response
+from ..metrics import render
+
+
+metrics_router = APIRouter(tags=["Metrics"])
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+def get_metrics():
+    # Sync so merging multiprocess files runs in the threadpool
+    body, content_type = render()
+    return Response(content=body, media_type=content_type)
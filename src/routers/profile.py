@@ -0,0 +1,48 @@
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi_jwt_auth import AuthJWT
+from ..denylist import load_denylist
+from ..profiling import get_profile, list_profiles, render_profile
+from ..security import admin_required
+
+
+profiles_router = APIRouter(
+    prefix="/profiles", tags=["Profiling"], dependencies=[Depends(load_denylist)]
+)
+
+
+@profiles_router.get("")
+async def get_profiles(authorize: AuthJWT = Depends()):
+    admin_required(authorize)
+    return await list_profiles()
+
+
+@profiles_router.get("/{profile_id}")
+async def get_request_profile(
+    profile_id: str,
+    format: Literal["text", "pstats"] = "text",
+    sort: Literal["cumulative", "tottime", "calls"] = "cumulative",
+    limit: int = Query(50, ge=1, le=1000),
+    authorize: AuthJWT = Depends(),
+):
+    admin_required(authorize)
+    profile = await get_profile(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    meta, raw = profile
+    if format == "pstats":
+        # Readable by `python -m pstats` and snakeviz
+        return Response(
+            content=raw,
+            media_type="application/octet-stream",
+            headers={
+                "Content-Disposition": f'attachment; filename="{profile_id}.pstats"'
+            },
+        )
+    header = (
+        f"{meta['method']} {meta['path']} {meta['status']}"
+        f" wall {meta['wall_ms']} ms, cpu {meta['cpu_ms']} ms\n\n"
+    )
+    return Response(
+        content=header + render_profile(raw, sort, limit), media_type="text/plain"
+    )
@@ -1,12 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException
-from ..schemas.summary import SummarySchema, SummarySchemaCreate, SummarySchemaUpdate
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from ..schemas.summary import (
+    SummaryParentSchema,
+    SummarySchema,
+    SummarySchemaCreate,
+    SummarySchemaUpdate,
+    SummarySearchSchema,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
+from ..batch import id_list, respond_many
+from ..cache import cached_response, summary_cache
 from ..db import get_db
-from ..services.summary import create, get_by_id, get_all, update, delete
+from ..etag import is_conditional, is_fresh, not_modified
+from ..denylist import load_denylist
+from ..fieldsets import FieldSet, fieldset
+from ..pagination import AutocompletePagination, Pagination, RankedPagination
+from ..export import ExportFormat, export_response
+from ..security import admin_required
+from ..serializers import dumps, respond
+from ..services.importer import import_summaries, iter_lines
+from ..services.summary import (
+    autocomplete,
+    create,
+    get_by_id,
+    get_all,
+    get_many,
+    get_version,
+    get_versions,
+    search,
+    sparse,
+    update,
+    delete,
+    stream_all,
+    version,
+)
 from fastapi_jwt_auth import AuthJWT
 
 
-summaries_router = APIRouter(prefix="/summaries", tags=["Summaries"])
+summary_fields = fieldset(SummarySchema)
+
+summaries_router = APIRouter(
+    prefix="/summaries", tags=["Summaries"], dependencies=[Depends(load_denylist)]
+)
 
 
 @summaries_router.post("", response_model=SummarySchema, status_code=201)
@@ -19,7 +53,7 @@ async def create_summary(
     result = await create(db, summary)
     if not result:
         raise HTTPException(status_code=400, detail=f"User not found")
-    return result
+    return respond(SummarySchema, result, status_code=201)
 
 
 @summaries_router.patch("/{summary_id}", response_model=SummarySchema)
@@ -32,7 +66,7 @@ async def update_summary(
     authorize.jwt_required()
     user_claims = authorize.get_raw_jwt()["user_claims"]
     new_summary_data = payload.dict()
-    summary = await get_by_id(db, summary_id)
+    summary = await get_by_id(db, summary_id, load="bare")
 
     if not summary:
         raise HTTPException(status_code=404, detail="Summary not found")
@@ -43,7 +77,7 @@ async def update_summary(
     if not any(new_summary_data.values()):
         raise HTTPException(status_code=400)
 
-    return await update(db, payload, summary)
+    return respond(SummarySchema, await update(db, payload, summary))
 
 
 @summaries_router.delete("/{summary_id}", status_code=204)
@@ -52,7 +86,7 @@ async def delete_summary(
 ):
     authorize.jwt_required()
     user_claims = authorize.get_raw_jwt()["user_claims"]
-    summary = await get_by_id(db, summary_id)
+    summary = await get_by_id(db, summary_id, load="bare")
 
     if not summary:
         raise HTTPException(status_code=404, detail="Summary not found")
@@ -64,20 +98,115 @@ async def delete_summary(
 
 @summaries_router.get("", response_model=list[SummarySchema])
 async def get_summaries(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    limit: int | None = None,
+    page: Pagination = Depends(),
+    selection: FieldSet = Depends(summary_fields),
+    ids: list[int] | None = Depends(id_list),
     authorize: AuthJWT = Depends(),
 ):
     authorize.jwt_required()
-    return await get_all(db, limit)
+    load = sparse(selection.fields, selection.include) if selection.sparse else "full"
+    if ids is not None:
+        summaries = await get_many(db, ids, load)
+        return respond_many(SummarySchema, ids, summaries, "Summary", selection.exclude)
+
+    etag = None
+    if is_conditional(request) or selection.sparse:
+        versions = await get_versions(db, page.limit, page.after, page.before)
+        etag = selection.etag(*versions)
+        if is_fresh(request, etag):
+            return not_modified(etag)
+
+    summaries = await get_all(db, page.limit, page.after, page.before, load)
+    page.set_link_header(request, response, summaries)
+    response.headers["ETag"] = etag or selection.etag(*map(version, summaries))
+    return respond(SummarySchema, summaries, response, exclude=selection.exclude)
+
+
+@summaries_router.get("/export")
+async def export_summaries(
+    export_format: ExportFormat = Query("ndjson", alias="format"),
+    db: AsyncSession = Depends(get_db),
+    authorize: AuthJWT = Depends(),
+):
+    authorize.jwt_required()
+    return export_response(await stream_all(db), export_format, "summaries")
+
+
+@summaries_router.post("/import")
+async def import_summaries_ndjson(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    authorize: AuthJWT = Depends(),
+):
+    admin_required(authorize)
+    return await import_summaries(db, iter_lines(request.stream()))
+
+
+@summaries_router.get("/search", response_model=list[SummarySearchSchema])
+async def search_summaries(
+    request: Request,
+    response: Response,
+    q: str = Query(min_length=1, max_length=200),
+    db: AsyncSession = Depends(get_db),
+    page: RankedPagination = Depends(),
+    authorize: AuthJWT = Depends(),
+):
+    authorize.jwt_required()
+    results = await search(db, q, page.limit, page.after)
+    page.set_link_header(request, response, results)
+    return respond(SummarySearchSchema, results, response)
+
+
+@summaries_router.get("/autocomplete", response_model=list[SummaryParentSchema])
+async def autocomplete_summaries(
+    request: Request,
+    response: Response,
+    q: str = Query(min_length=1, max_length=100),
+    db: AsyncSession = Depends(get_db),
+    page: AutocompletePagination = Depends(),
+    authorize: AuthJWT = Depends(),
+):
+    authorize.jwt_required()
+    results = await autocomplete(db, q, page.limit, page.after)
+    page.set_link_header(request, response, results)
+    return respond(SummaryParentSchema, results, response)
 
 
 @summaries_router.get("/{summary_id}", response_model=SummarySchema)
 async def get_summary(
-    summary_id: int, db: AsyncSession = Depends(get_db), authorize: AuthJWT = Depends()
+    summary_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    selection: FieldSet = Depends(summary_fields),
+    authorize: AuthJWT = Depends(),
 ):
     authorize.jwt_required()
-    summary = await get_by_id(db, summary_id)
+    etag = None
+    if is_conditional(request) or selection.sparse:
+        current = await get_version(db, summary_id)
+        if not current:
+            raise HTTPException(status_code=404, detail="Summary not found")
+        etag = selection.etag(current)
+        if is_fresh(request, etag):
+            return not_modified(etag)
+
+    if not selection.sparse:
+        entry, cache_version = await summary_cache.get(summary_id)
+        if entry is not None:
+            return cached_response(*entry, hit=True)
+
+    load = sparse(selection.fields, selection.include) if selection.sparse else "full"
+    summary = await get_by_id(db, summary_id, load)
     if not summary:
         raise HTTPException(status_code=404, detail="Summary not found")
-    return summary
+    if selection.sparse:
+        response.headers["ETag"] = etag
+        return respond(SummarySchema, summary, response, exclude=selection.exclude)
+
+    etag, body = selection.etag(version(summary)), dumps(SummarySchema, summary)
+    await summary_cache.set(summary_id, etag, body, cache_version)
+    return cached_response(etag, body, hit=False)
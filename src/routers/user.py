@@ -1,47 +1,141 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
-from ..schemas.user import UserSchemaCreate, UserSchemaUpdate, UserSchema
+from ..schemas.user import (
+    UserParentSchema,
+    UserSchemaCreate,
+    UserSchemaUpdate,
+    UserSchema,
+)
 from ..schemas.summary import SummaryUserSchema
 from ..schemas.comment import CommentUserSchema
-from ..services.user import create, get_by_id, get_all, update, get_by_username, delete
+from ..services.user import (
+    autocomplete,
+    create,
+    get_by_id,
+    get_all,
+    get_many,
+    get_version,
+    get_versions,
+    sparse,
+    update,
+    get_by_username,
+    delete,
+    version,
+)
+from ..batch import id_list, respond_many
+from ..cache import cached_response, user_cache
 from ..db import get_db
+from ..etag import is_conditional, is_fresh, not_modified
+from ..denylist import load_denylist
+from ..fieldsets import FieldSet, fieldset
+from ..pagination import AutocompletePagination, Pagination
+from ..serializers import dumps, respond
 from fastapi_jwt_auth import AuthJWT
 
 
-users_router = APIRouter(prefix="/users", tags=["Users"])
+user_fields = fieldset(UserSchema)
+
+users_router = APIRouter(
+    prefix="/users", tags=["Users"], dependencies=[Depends(load_denylist)]
+)
 
 
 @users_router.get("/me", response_model=UserSchema)
 async def get_current_user(
-    db: AsyncSession = Depends(get_db), authorize: AuthJWT = Depends()
+    db: AsyncSession = Depends(get_db),
+    selection: FieldSet = Depends(user_fields),
+    authorize: AuthJWT = Depends(),
 ):
     authorize.jwt_required()
     current_user = authorize.get_jwt_subject()
-    db_user = await get_by_username(db, current_user)
+    # Summaries and comments come with one selectin query each, clients that
+    # don't need them leave them out with include=
+    load = sparse(selection.fields, selection.include) if selection.sparse else "full"
+    db_user = await get_by_username(db, current_user, load)
     if not db_user:
         raise HTTPException(status_code=401)
-    return db_user
+    return respond(UserSchema, db_user, exclude=selection.exclude)
+
+
+@users_router.get("/autocomplete", response_model=list[UserParentSchema])
+async def autocomplete_users(
+    request: Request,
+    response: Response,
+    q: str = Query(min_length=1, max_length=100),
+    db: AsyncSession = Depends(get_db),
+    page: AutocompletePagination = Depends(),
+    authorize: AuthJWT = Depends(),
+):
+    authorize.jwt_required()
+    results = await autocomplete(db, q, page.limit, page.after)
+    page.set_link_header(request, response, results)
+    return respond(UserParentSchema, results, response)
 
 
 @users_router.get("/{user_id}", response_model=UserSchema)
 async def get_user(
-    user_id: int, db: AsyncSession = Depends(get_db), authorize: AuthJWT = Depends()
+    user_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    selection: FieldSet = Depends(user_fields),
+    authorize: AuthJWT = Depends(),
 ):
     authorize.jwt_required()
-    user = await get_by_id(db, user_id)
+    etag = None
+    if is_conditional(request) or selection.sparse:
+        current = await get_version(db, user_id)
+        if not current:
+            raise HTTPException(status_code=404, detail="User not found")
+        etag = selection.etag(current)
+        if is_fresh(request, etag):
+            return not_modified(etag)
+
+    if not selection.sparse:
+        entry, cache_version = await user_cache.get(user_id)
+        if entry is not None:
+            return cached_response(*entry, hit=True)
+
+    load = sparse(selection.fields, selection.include) if selection.sparse else "full"
+    user = await get_by_id(db, user_id, load)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    if selection.sparse:
+        response.headers["ETag"] = etag
+        return respond(UserSchema, user, response, exclude=selection.exclude)
+
+    etag, body = selection.etag(version(user)), dumps(UserSchema, user)
+    await user_cache.set(user_id, etag, body, cache_version)
+    return cached_response(etag, body, hit=False)
 
 
 @users_router.get("", response_model=list[UserSchema])
 async def get_users(
+    request: Request,
+    response: Response,
     db: AsyncSession = Depends(get_db),
-    limit: int | None = None,
+    page: Pagination = Depends(),
+    selection: FieldSet = Depends(user_fields),
+    ids: list[int] | None = Depends(id_list),
     authorize: AuthJWT = Depends(),
 ):
     authorize.jwt_required()
-    return await get_all(db, limit)
+    load = sparse(selection.fields, selection.include) if selection.sparse else "full"
+    if ids is not None:
+        users = await get_many(db, ids, load)
+        return respond_many(UserSchema, ids, users, "User", selection.exclude)
+
+    etag = None
+    if is_conditional(request) or selection.sparse:
+        versions = await get_versions(db, page.limit, page.after, page.before)
+        etag = selection.etag(*versions)
+        if is_fresh(request, etag):
+            return not_modified(etag)
+
+    users = await get_all(db, page.limit, page.after, page.before, load)
+    page.set_link_header(request, response, users)
+    response.headers["ETag"] = etag or selection.etag(*map(version, users))
+    return respond(UserSchema, users, response, exclude=selection.exclude)
 
 
 @users_router.post("", response_model=UserSchema, status_code=201)
@@ -49,7 +143,7 @@ async def create_user(user: UserSchemaCreate, db: AsyncSession = Depends(get_db)
     new_user = await create(db, user)
     if not new_user:
         raise HTTPException(status_code=400, detail="User already exists")
-    return new_user
+    return respond(UserSchema, new_user, status_code=201)
 
 
 @users_router.patch("/{user_id}", response_model=UserSchema)
@@ -70,12 +164,12 @@ async def update_user(
     if not any(new_user_data.values()):
         raise HTTPException(status_code=400)
 
-    existed_user = await get_by_username(db, username=username)
+    existed_user = await get_by_username(db, username=username, load="bare")
 
     if not existed_user:
         raise HTTPException(status_code=400, detail="User not found")
 
-    return await update(db, payload, existed_user)
+    return respond(UserSchema, await update(db, payload, existed_user))
 
 
 @users_router.delete("/{user_id}", status_code=204)
@@ -88,7 +182,7 @@ async def delete_user(
     if not user_claims["id"] == user_id:
         raise HTTPException(status_code=405)
 
-    existed_user = await get_by_id(db, user_id)
+    existed_user = await get_by_id(db, user_id, load="bare")
     if not existed_user:
         raise HTTPException(status_code=400, detail="User not found")
 
@@ -100,10 +194,10 @@ async def get_user_summaries(
     user_id: int, db: AsyncSession = Depends(get_db), authorize: AuthJWT = Depends()
 ):
     authorize.jwt_required()
-    user = await get_by_id(db, user_id)
+    user = await get_by_id(db, user_id, load="summaries")
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user.summaries
+    return respond(SummaryUserSchema, user.summaries)
 
 
 @users_router.get("/{user_id}/comments", response_model=list[CommentUserSchema])
@@ -111,7 +205,7 @@ async def get_user_comments(
     user_id: int, db: AsyncSession = Depends(get_db), authorize: AuthJWT = Depends()
 ):
     authorize.jwt_required()
-    user = await get_by_id(db, user_id)
+    user = await get_by_id(db, user_id, load="comments")
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user.comments
+    return respond(CommentUserSchema, user.comments)
@@ -15,17 +15,15 @@ class CommentSchemaUpdate(CommentSchemaBase):
     pass
 
 
-class CommentSchema(BaseModel):
+class CommentSchemaBatchUpdate(CommentSchemaUpdate):
+    id: int = Field(ge=1)
+
+
+class CommentShortSchema(BaseModel):
     id: int
     text: str
     created_at: str
     updated_at: str
-    user: "UserParentSchema" = Field(
-        exclude={"summaries", "comments", "created_at", "updated_at", "role"}
-    )
-    summary: "SummaryParentSchema" = Field(
-        exclude={"user", "comments", "created_at", "updated_at"}
-    )
 
     @validator("created_at", "updated_at", pre=True)
     def parse_dates(cls, value):
@@ -35,9 +33,25 @@ class CommentSchema(BaseModel):
         orm_mode = True
 
 
-class CommentUserSchema(CommentSchema):
+class CommentSummarySchema(CommentShortSchema):
+    user: "UserParentSchema"
+
+    class Config:
+        orm_mode = True
+
+
+class CommentUserSchema(CommentShortSchema):
+    summary: "SummaryParentSchema"
+
+    class Config:
+        orm_mode = True
+
+
+class CommentSchema(CommentShortSchema):
+    user: "UserParentSchema"
+    summary: "SummaryParentSchema"
+
     class Config:
-        fields = {"user": {"exclude": True}}
         orm_mode = True
 
 
@@ -45,4 +59,5 @@ from .user import UserParentSchema
 from .summary import SummaryParentSchema
 
 CommentSchema.update_forward_refs()
+CommentSummarySchema.update_forward_refs()
 CommentUserSchema.update_forward_refs()
@@ -24,14 +24,12 @@ class RoleUserSchema(BaseModel):
 
 
 class RoleSchema(RoleUserSchema):
-    users: list["UserSchema"] | None = Field(
-        include={"__all__": {"id", "username", "email", "fio"}}
-    )
+    users: list["UserParentSchema"] | None
 
     class Config:
         orm_mode = True
 
 
-from .user import UserSchema
+from .user import UserParentSchema
 
 RoleSchema.update_forward_refs()
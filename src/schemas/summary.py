@@ -15,34 +15,18 @@ class SummarySchemaUpdate(SummarySchemaBase):
     title: str | None = Field(min_length=2, max_length=50)
 
 
-class SummarySchema(BaseModel):
+class SummaryParentSchema(BaseModel):
     id: int
     title: str
     description: str | None = None
-    created_at: str
-    updated_at: str
-    user: "UserParentSchema" = Field(
-        exclude={"summaries", "comments", "created_at", "updated_at", "role"}
-    )
-    comments: list["CommentSchema"] | None = Field(exclude={"__all__": {"summary"}})
-
-    @validator("created_at", "updated_at", pre=True)
-    def parse_dates(cls, value):
-        return datetime.strftime(value, "%X %d.%m.%Y %Z")
 
     class Config:
         orm_mode = True
 
 
-class SummaryParentSchema(BaseModel):
-    id: int
-    title: str
-    description: str | None = None
+class SummaryUserSchema(SummaryParentSchema):
     created_at: str
     updated_at: str
-    user: "UserParentSchema" = Field(
-        exclude={"summaries", "comments", "created_at", "updated_at"}
-    )
 
     @validator("created_at", "updated_at", pre=True)
     def parse_dates(cls, value):
@@ -52,15 +36,23 @@ class SummaryParentSchema(BaseModel):
         orm_mode = True
 
 
-class SummaryUserSchema(SummarySchema):
+class SummarySearchSchema(SummaryUserSchema):
+    headline: str
+
+    class Config:
+        orm_mode = True
+
+
+class SummarySchema(SummaryUserSchema):
+    comment_count: int
+    user: "UserParentSchema"
+    comments: list["CommentSummarySchema"] | None
+
     class Config:
-        fields = {"user": {"exclude": True}, "comments": {"exclude": True}}
         orm_mode = True
 
 
 from .user import UserParentSchema
-from .comment import CommentSchema
+from .comment import CommentSummarySchema
 
 SummarySchema.update_forward_refs()
-SummaryParentSchema.update_forward_refs()
-SummaryUserSchema.update_forward_refs()
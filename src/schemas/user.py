@@ -10,7 +10,6 @@ class UserSchemaBase(BaseModel):
 
 class UserSchemaCreate(UserSchemaBase):
     password: str = Field(min_length=8, max_length=32)
-    role_id: int | None = Field(ge=1)
 
 
 class UserSchemaUpdate(UserSchemaBase):
@@ -18,37 +17,24 @@ class UserSchemaUpdate(UserSchemaBase):
     password: str | None = Field(min_length=8, max_length=32)
 
 
-class UserSchema(BaseModel):
+class UserParentSchema(BaseModel):
     id: int
     username: str
     email: EmailStr | None = None
     fio: str | None = None
-    created_at: str
-    updated_at: str
-    role: "RoleUserSchema" = Field(exclude={"id", "users"})
-    summaries: list["SummarySchema"] | None = Field(
-        exclude={"__all__": {"user", "comments"}}
-    )
-    comments: list["CommentSchema"] | None = Field(
-        exclude={"__all__": {"user", "summary"}}
-    )
-
-    @validator("created_at", "updated_at", pre=True)
-    def parse_dates(cls, value):
-        return datetime.strftime(value, "%X %d.%m.%Y %Z")
 
     class Config:
         orm_mode = True
 
 
-class UserParentSchema(BaseModel):
-    id: int
-    username: str
-    email: EmailStr | None = None
-    fio: str | None = None
+class UserSchema(UserParentSchema):
     created_at: str
     updated_at: str
-    role: "RoleUserSchema" = Field(exclude={"users"})
+    summary_count: int
+    comment_count: int
+    role: "RoleUserSchema" = Field(exclude={"id", "users"})
+    summaries: list["SummaryUserSchema"] | None
+    comments: list["CommentShortSchema"] | None
 
     @validator("created_at", "updated_at", pre=True)
     def parse_dates(cls, value):
@@ -59,8 +45,7 @@ class UserParentSchema(BaseModel):
 
 
 from .role import RoleUserSchema
-from .summary import SummarySchema
-from .comment import CommentSchema
+from .summary import SummaryUserSchema
+from .comment import CommentShortSchema
 
 UserSchema.update_forward_refs()
-UserParentSchema.update_forward_refs()
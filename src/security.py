@@ -1,4 +1,12 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Literal
+from fastapi import HTTPException
+from fastapi_jwt_auth import AuthJWT
 from passlib.context import CryptContext
+from src.config import settings
+from src.enums import RoleEnum
+from .metrics import PASSWORD_HASHER_TASKS
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -10,3 +18,63 @@ def verify_password(raw_password: str, hashed_password: str) -> bool:
 
 def get_password_hash(raw_password: str) -> str:
     return pwd_context.hash(raw_password)
+
+
+def admin_required(authorize: AuthJWT) -> None:
+    authorize.jwt_required()
+    if authorize.get_raw_jwt()["user_claims"]["role"] != RoleEnum.admin.name:
+        raise HTTPException(status_code=403)
+
+
+class PasswordHasher:
+    def __init__(self, workers: int, executor: Literal["thread", "process"]):
+        self.workers = workers
+        self.executor_type = executor
+        self._executor: Executor | None = None
+        # Callers wait here rather than in the executor's internal queue, so
+        # the backlog can be measured and a cancelled request never hashes
+        self._semaphore = asyncio.Semaphore(workers)
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def _run(self, func: Callable, *args):
+        queued = PASSWORD_HASHER_TASKS.labels("queued")
+        queued.inc()
+        try:
+            await self._semaphore.acquire()
+        finally:
+            queued.dec()
+
+        in_flight = PASSWORD_HASHER_TASKS.labels("in_flight")
+        in_flight.inc()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            in_flight.dec()
+            self._semaphore.release()
+
+    async def verify(self, raw_password: str, hashed_password: str) -> bool:
+        return await self._run(verify_password, raw_password, hashed_password)
+
+    async def hash(self, raw_password: str) -> str:
+        return await self._run(get_password_hash, raw_password)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    settings.PASSWORD_HASHER_WORKERS, settings.PASSWORD_HASHER_EXECUTOR
+)
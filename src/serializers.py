@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Iterable
+import orjson
+from fastapi import Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON, ModelField
+
+# Schema validators the compiled serializers know how to reproduce
+DATE_VALIDATORS = {"parse_dates"}
+
+
+@lru_cache(maxsize=4096)
+def _format_datetime(
+    value: datetime, offset: timedelta | None, zone: str | None
+) -> str:
+    return value.strftime("%X %d.%m.%Y %Z")
+
+
+def format_datetime(value: datetime) -> str:
+    # Equal instants in other time zones compare equal but print differently
+    return _format_datetime(value, value.utcoffset(), value.tzname())
+
+
+def _nullable(convert: Callable) -> Callable:
+    return lambda value: None if value is None else convert(value)
+
+
+def _converter(field: ModelField) -> Callable | None:
+    validators = {v.func.__name__ for v in field.class_validators.values()}
+    if validators - DATE_VALIDATORS:
+        raise TypeError(f"Can't compile validators of field {field.name!r}")
+    if validators:
+        return format_datetime
+
+    if not (isinstance(field.type_, type) and issubclass(field.type_, BaseModel)):
+        return None
+    exclude = field.field_info.exclude or ()
+    if isinstance(exclude, dict):
+        # Only the flat form, {"name": ...} excludes the same as {"name"}
+        if any(value is not ... and value is not True for value in exclude.values()):
+            raise TypeError(f"Can't compile nested exclude of field {field.name!r}")
+        exclude = exclude.keys()
+    nested = compile_serializer(field.type_, frozenset(exclude))
+    if field.shape == SHAPE_LIST:
+        return _nullable(lambda items: [nested(item) for item in items])
+    if field.shape == SHAPE_SINGLETON:
+        return _nullable(nested)
+    raise TypeError(f"Can't compile shape of field {field.name!r}")
+
+
+@lru_cache
+def compile_serializer(
+    schema: type[BaseModel], exclude: frozenset[str] = frozenset()
+) -> Callable[[Any], dict]:
+    # Builds the dict `schema.from_orm(obj).dict()` would, minus validation
+    extractors = [
+        (field.alias, attrgetter(name), _converter(field))
+        for name, field in schema.__fields__.items()
+        if name not in exclude
+    ]
+
+    def serialize(obj) -> dict:
+        data = {}
+        for key, get, convert in extractors:
+            value = get(obj)
+            data[key] = value if convert is None else convert(value)
+        return data
+
+    return serialize
+
+
+def serialize(
+    schema: type[BaseModel],
+    content: Any | Iterable,
+    exclude: frozenset[str] = frozenset(),
+) -> dict | list[dict]:
+    serializer = compile_serializer(schema, exclude)
+    if isinstance(content, (list, tuple)):
+        return [serializer(obj) for obj in content]
+    return serializer(content)
+
+
+def dumps(
+    schema: type[BaseModel],
+    content: Any | Iterable,
+    exclude: frozenset[str] = frozenset(),
+) -> bytes:
+    return orjson.dumps(serialize(schema, content, exclude))
+
+
+def respond(
+    schema: type[BaseModel],
+    content: Any | Iterable,
+    response: Response | None = None,
+    status_code: int = 200,
+    exclude: frozenset[str] = frozenset(),
+) -> ORJSONResponse:
+    # Headers set on the injected response aren't merged into returned ones
+    headers = dict(response.headers) if response is not None else None
+    return ORJSONResponse(
+        serialize(schema, content, exclude), status_code=status_code, headers=headers
+    )
@@ -1,36 +1,143 @@
+from collections import defaultdict
 from typing import Literal, Sequence
 from ..models import Comment, Summary, User
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from sqlalchemy import Select, case
+from sqlalchemy import delete as sa_delete
+from sqlalchemy import insert as sa_insert
 from sqlalchemy import select as sa_select
 from sqlalchemy import update as sa_update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, load_only, selectinload
+from ..cache import summary_cache, user_cache
+from ..config import settings
+from ..db import any_of, violated_constraint
+from ..pagination import keyset
 from ..schemas.comment import CommentSchemaCreate, CommentSchemaUpdate
 
 
-async def get_by_id(db: AsyncSession, comment_id: int | str) -> Comment | None:
-    return await db.get(Comment, comment_id)
+CommentLoad = Literal["bare", "full"]
 
+RELATIONS = {
+    "user": joinedload(Comment.user),
+    "summary": joinedload(Comment.summary),
+}
 
-async def get_all(db: AsyncSession, bound: int | None = None) -> Sequence[Comment]:
-    stmt = sa_select(Comment).limit(bound).order_by(Comment.id)
+LOADERS = {
+    "bare": (),
+    "full": tuple(RELATIONS.values()),
+}
+
+
+def sparse(fields: Sequence[str], include: Sequence[str]) -> tuple:
+    columns = (getattr(Comment, name) for name in fields)
+    return (load_only(Comment.id, *columns), *(RELATIONS[name] for name in include))
+
+
+async def get_by_id(
+    db: AsyncSession, comment_id: int | str, load: CommentLoad | tuple = "full"
+) -> Comment | None:
+    options = LOADERS[load] if isinstance(load, str) else load
+    return await db.get(Comment, comment_id, options=options, populate_existing=True)
+
+
+async def get_all(
+    db: AsyncSession,
+    bound: int | None = None,
+    after: int | None = None,
+    before: int | None = None,
+    load: CommentLoad | tuple = "full",
+) -> Sequence[Comment]:
+    options = LOADERS[load] if isinstance(load, str) else load
+    stmt = keyset(sa_select(Comment), Comment.id, bound, after, before)
+    comments = (await db.execute(stmt.options(*options))).scalars().all()
+    return comments[::-1] if before is not None else comments
+
+
+async def get_many(
+    db: AsyncSession, ids: Sequence[int], load: CommentLoad | tuple = "full"
+) -> Sequence[Comment]:
+    options = LOADERS[load] if isinstance(load, str) else load
+    stmt = sa_select(Comment).where(any_of(Comment.id, ids)).options(*options)
     return (await db.execute(stmt)).scalars().all()
 
 
+def version(comment: Comment) -> tuple:
+    # Must agree with `version_query` for a comment loaded with LOADERS["full"]
+    return (
+        comment.id,
+        comment.updated_at,
+        comment.user.updated_at,
+        comment.summary.updated_at,
+    )
+
+
+def version_query() -> Select:
+    return sa_select(
+        Comment.id,
+        Comment.updated_at,
+        sa_select(User.updated_at).where(User.id == Comment.user_id).scalar_subquery(),
+        sa_select(Summary.updated_at)
+        .where(Summary.id == Comment.summary_id)
+        .scalar_subquery(),
+    )
+
+
+async def get_version(db: AsyncSession, comment_id: int) -> tuple | None:
+    row = (await db.execute(version_query().where(Comment.id == comment_id))).first()
+    return tuple(row) if row else None
+
+
+async def get_versions(
+    db: AsyncSession,
+    bound: int | None = None,
+    after: int | None = None,
+    before: int | None = None,
+) -> list[tuple]:
+    stmt = keyset(version_query(), Comment.id, bound, after, before)
+    rows = [tuple(row) for row in (await db.execute(stmt)).all()]
+    return rows[::-1] if before is not None else rows
+
+
+async def stream_all(db: AsyncSession) -> AsyncResult:
+    stmt = (
+        sa_select(
+            Comment.id,
+            Comment.text,
+            Comment.created_at,
+            Comment.updated_at,
+            Comment.user_id,
+            Comment.summary_id,
+        )
+        .order_by(Comment.id)
+        .execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+    )
+    return await db.stream(stmt)
+
+
 async def create(
     db: AsyncSession, comment: CommentSchemaCreate
 ) -> Comment | Literal["User", "Summary"]:
     payload = comment.dict(exclude_none=True, exclude_unset=True)
-    user = await db.get(User, payload["user_id"])
-    if not user:
-        return "User"
+    query = (
+        sa_insert(Comment)
+        .values(payload)
+        .returning(Comment)
+        .options(selectinload(Comment.user), selectinload(Comment.summary))
+    )
+    try:
+        db_comment = (await db.execute(query)).scalar_one()
+    except IntegrityError as error:
+        await db.rollback()
+        constraint = violated_constraint(error)
+        if constraint == "comments_user_id_fkey":
+            return "User"
+        if constraint == "comments_summary_id_fkey":
+            return "Summary"
+        raise
 
-    summary = await db.get(Summary, payload["summary_id"])
-    if not summary:
-        return "Summary"
-
-    db_comment = Comment(**payload)
-    db.add(db_comment)
     await db.commit()
-    await db.refresh(db_comment)
+    await invalidate(db_comment)
     return db_comment
 
 
@@ -38,13 +145,114 @@ async def update(
     db: AsyncSession, payload: CommentSchemaUpdate, comment: Comment
 ) -> Comment:
     update_data = payload.dict(exclude_none=True, exclude_unset=True)
-    query = sa_update(Comment).where(Comment.id == comment.id).values(update_data)
-    await db.execute(query)
+    query = (
+        sa_update(Comment)
+        .where(Comment.id == comment.id)
+        .values(update_data)
+        .returning(Comment)
+        .options(selectinload(Comment.user), selectinload(Comment.summary))
+        .execution_options(populate_existing=True)
+    )
+    comment = (await db.execute(query)).scalar_one()
     await db.commit()
-    await db.refresh(comment)
+    await invalidate(comment)
     return comment
 
 
 async def delete(db: AsyncSession, comment: Comment) -> None:
     await db.delete(comment)
     await db.commit()
+    await invalidate(comment)
+
+
+async def get_owners(db: AsyncSession, ids: Sequence[int]) -> dict[int, int]:
+    query = sa_select(Comment.id, Comment.user_id).where(any_of(Comment.id, ids))
+    return dict((await db.execute(query)).all())
+
+
+async def locked_ids(db: AsyncSession, column, ids: set[int]) -> set[int]:
+    # The counter trigger will UPDATE these rows, so take that lock (NO KEY
+    # UPDATE, which FK checks of other inserts still pass) up front in id
+    # order; an overlapping batch then waits here instead of deadlocking
+    query = (
+        sa_select(column)
+        .where(any_of(column, ids))
+        .order_by(column)
+        .with_for_update(key_share=True)
+    )
+    return set((await db.execute(query)).scalars().all())
+
+
+async def create_many(
+    db: AsyncSession, comments: Sequence[CommentSchemaCreate]
+) -> list[Comment | Literal["User", "Summary"]]:
+    # Same table order as the counter trigger: summaries, then users
+    summaries = await locked_ids(
+        db, Summary.id, {comment.summary_id for comment in comments}
+    )
+    users = await locked_ids(db, User.id, {comment.user_id for comment in comments})
+    results: list = []
+    payload = []
+    for comment in comments:
+        if comment.user_id not in users:
+            results.append("User")
+        elif comment.summary_id not in summaries:
+            results.append("Summary")
+        else:
+            results.append(None)
+            payload.append(comment.dict())
+    if not payload:
+        await db.rollback()
+        return results
+
+    query = (
+        sa_insert(Comment)
+        .values(payload)
+        .returning(Comment)
+        .options(selectinload(Comment.user), selectinload(Comment.summary))
+    )
+    inserted = (await db.execute(query)).scalars().all()
+    await db.commit()
+    await invalidate(*inserted)
+
+    # RETURNING order isn't guaranteed, so rows are matched back by content
+    pending = defaultdict(list)
+    for comment in sorted(inserted, key=lambda comment: comment.id):
+        pending[(comment.text, comment.user_id, comment.summary_id)].append(comment)
+    return [
+        result
+        if result is not None
+        else pending[(comment.text, comment.user_id, comment.summary_id)].pop(0)
+        for comment, result in zip(comments, results)
+    ]
+
+
+async def update_many(db: AsyncSession, texts: dict[int, str]) -> list[Comment]:
+    query = (
+        sa_update(Comment)
+        .where(any_of(Comment.id, texts))
+        .values(text=case(texts, value=Comment.id))
+        .returning(Comment)
+        .options(selectinload(Comment.user), selectinload(Comment.summary))
+    )
+    comments = (await db.execute(query)).scalars().all()
+    await db.commit()
+    await invalidate(*comments)
+    return comments
+
+
+async def delete_many(db: AsyncSession, ids: Sequence[int]) -> None:
+    query = (
+        sa_delete(Comment)
+        .where(any_of(Comment.id, ids))
+        .returning(Comment.user_id, Comment.summary_id)
+        .execution_options(synchronize_session=False)
+    )
+    deleted = (await db.execute(query)).all()
+    await db.commit()
+    await invalidate(*deleted)
+
+
+async def invalidate(*comments) -> None:
+    await summary_cache.invalidate(comment.summary_id for comment in comments)
+    await user_cache.invalidate(comment.user_id for comment in comments)
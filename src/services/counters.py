@@ -0,0 +1,102 @@
+from sqlalchemy import Select, func, text
+from sqlalchemy import select as sa_select
+from sqlalchemy import update as sa_update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..cache import summary_cache, user_cache
+from ..db import any_of
+from ..models import Comment, Summary, User
+
+
+async def lock_users(
+    db: AsyncSession, ids: set[int], deleted_id: int | None = None
+) -> None:
+    # Cascades and the counter triggers update user rows in plan order, so two
+    # deletes sharing commenters can each hold a row the other needs. Locking
+    # every affected user up front in id order makes the second one wait.
+    def lock(user_ids: set[int]) -> Select:
+        query = sa_select(User.id).where(any_of(User.id, user_ids))
+        return query.order_by(User.id).with_for_update(key_share=True)
+
+    if deleted_id is None:
+        await db.execute(lock(ids))
+        return
+    # Only the deleted row needs FOR UPDATE, the others stay open to FK checks
+    # of unrelated inserts; still in id order, split around the deleted row
+    before = {user_id for user_id in ids if user_id < deleted_id}
+    after = {user_id for user_id in ids if user_id > deleted_id}
+    if before:
+        await db.execute(lock(before))
+    await db.execute(sa_select(User.id).where(User.id == deleted_id).with_for_update())
+    if after:
+        await db.execute(lock(after))
+
+
+async def recount_summaries(db: AsyncSession) -> list[int]:
+    counts = (
+        sa_select(Summary.id, func.count(Comment.id).label("comments"))
+        .outerjoin(Comment, Comment.summary_id == Summary.id)
+        .group_by(Summary.id)
+        .subquery()
+    )
+    stmt = (
+        sa_update(Summary)
+        .where(Summary.id == counts.c.id)
+        .where(Summary.comment_count != counts.c.comments)
+        # Set explicitly so onupdate doesn't bump it, the row's content is unchanged
+        .values(comment_count=counts.c.comments, updated_at=Summary.updated_at)
+        .returning(Summary.id)
+        .execution_options(synchronize_session=False)
+    )
+    return list((await db.execute(stmt)).scalars().all())
+
+
+async def recount_users(db: AsyncSession) -> list[int]:
+    summaries = (
+        sa_select(Summary.user_id, func.count().label("n"))
+        .group_by(Summary.user_id)
+        .subquery()
+    )
+    comments = (
+        sa_select(Comment.user_id, func.count().label("n"))
+        .group_by(Comment.user_id)
+        .subquery()
+    )
+    counts = (
+        sa_select(
+            User.id,
+            func.coalesce(summaries.c.n, 0).label("summaries"),
+            func.coalesce(comments.c.n, 0).label("comments"),
+        )
+        .outerjoin(summaries, summaries.c.user_id == User.id)
+        .outerjoin(comments, comments.c.user_id == User.id)
+        .subquery()
+    )
+    stmt = (
+        sa_update(User)
+        .where(User.id == counts.c.id)
+        .where(
+            (User.summary_count != counts.c.summaries)
+            | (User.comment_count != counts.c.comments)
+        )
+        .values(
+            summary_count=counts.c.summaries,
+            comment_count=counts.c.comments,
+            updated_at=User.updated_at,
+        )
+        .returning(User.id)
+        .execution_options(synchronize_session=False)
+    )
+    return list((await db.execute(stmt)).scalars().all())
+
+
+async def backfill(db: AsyncSession) -> dict[str, int]:
+    # Writes to the counted tables wait until the recount commits, so no
+    # trigger update can land between counting and storing
+    await db.execute(text("LOCK TABLE summaries, comments IN SHARE MODE"))
+    summary_ids = await recount_summaries(db)
+    user_ids = await recount_users(db)
+    await db.commit()
+
+    await summary_cache.invalidate(summary_ids)
+    await user_cache.invalidate(user_ids)
+    return {"summaries": len(summary_ids), "users": len(user_ids)}
@@ -0,0 +1,152 @@
+import json
+from datetime import datetime, timezone
+from typing import AsyncIterable, Iterable
+from asyncpg import PostgresError
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import select as sa_select
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..cache import summary_cache, user_cache
+from ..config import settings
+from ..models import Comment, Summary, User
+from ..schemas.comment import CommentSchemaCreate
+from ..schemas.summary import SummarySchemaCreate
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterable[bytes]:
+    tail = b""
+    async for chunk in chunks:
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line
+    if tail:
+        yield tail
+
+
+async def copy_records(
+    db: AsyncSession, table: str, columns: list[str], records: list[tuple]
+) -> None:
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(
+        table, records=records, columns=columns
+    )
+
+
+async def existing_ids(db: AsyncSession, column, ids: Iterable[int]) -> set[int]:
+    query = sa_select(column).where(column.in_(set(ids)))
+    return set((await db.execute(query)).scalars().all())
+
+
+class Report:
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors: list[dict] = []
+
+    def error(self, line: int, detail) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.IMPORT_MAX_ERRORS:
+            self.errors.append({"line": line, "detail": detail})
+
+    def dict(self) -> dict:
+        return {"imported": self.imported, "failed": self.failed, "errors": self.errors}
+
+
+def parse_batch(
+    batch: list[tuple[int, bytes]], schema: type[BaseModel], report: Report
+) -> list[tuple[int, BaseModel]]:
+    rows = []
+    for line_number, line in batch:
+        try:
+            rows.append((line_number, schema.parse_obj(json.loads(line))))
+        except ValidationError as error:
+            report.error(line_number, error.errors())
+        except ValueError:
+            # Malformed JSON, or bytes that aren't UTF-8 to begin with
+            report.error(line_number, "Invalid JSON")
+    return rows
+
+
+async def import_batch(
+    db: AsyncSession,
+    table: str,
+    columns: list[str],
+    rows: list[tuple[int, tuple]],
+    report: Report,
+) -> bool:
+    if not rows:
+        return False
+    try:
+        await copy_records(db, table, columns, [record for _, record in rows])
+        await db.commit()
+    except PostgresError as error:
+        await db.rollback()
+        for line_number, _ in rows:
+            report.error(line_number, str(error))
+        return False
+    report.imported += len(rows)
+    return True
+
+
+async def batches(lines: AsyncIterable[bytes]) -> AsyncIterable[list]:
+    batch = []
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        batch.append((line_number, line))
+        if len(batch) >= settings.IMPORT_BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def import_summaries(db: AsyncSession, lines: AsyncIterable[bytes]) -> dict:
+    report = Report()
+    async for batch in batches(lines):
+        rows = parse_batch(batch, SummarySchemaCreate, report)
+        users = await existing_ids(db, User.id, (row.user_id for _, row in rows))
+        now = datetime.now(timezone.utc)
+        records = []
+        for line_number, row in rows:
+            if row.user_id not in users:
+                report.error(line_number, "User not found")
+                continue
+            record = (row.title, row.description, row.user_id, now, now)
+            records.append((line_number, record))
+
+        columns = ["title", "description", "user_id", "created_at", "updated_at"]
+        if await import_batch(db, Summary.__tablename__, columns, records, report):
+            # Authors' cached responses list their summaries and count them
+            await user_cache.invalidate({record[2] for _, record in records})
+    return report.dict()
+
+
+async def import_comments(db: AsyncSession, lines: AsyncIterable[bytes]) -> dict:
+    report = Report()
+    async for batch in batches(lines):
+        rows = parse_batch(batch, CommentSchemaCreate, report)
+        users = await existing_ids(db, User.id, (row.user_id for _, row in rows))
+        summaries = await existing_ids(
+            db, Summary.id, (row.summary_id for _, row in rows)
+        )
+        now = datetime.now(timezone.utc)
+        records = []
+        for line_number, row in rows:
+            if row.user_id not in users:
+                report.error(line_number, "User not found")
+                continue
+            if row.summary_id not in summaries:
+                report.error(line_number, "Summary not found")
+                continue
+            record = (row.text, row.user_id, row.summary_id, now, now)
+            records.append((line_number, record))
+
+        columns = ["text", "user_id", "summary_id", "created_at", "updated_at"]
+        if await import_batch(db, Comment.__tablename__, columns, records, report):
+            await summary_cache.invalidate({record[2] for _, record in records})
+            await user_cache.invalidate({record[1] for _, record in records})
+    return report.dict()
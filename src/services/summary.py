@@ -1,30 +1,197 @@
-from typing import Sequence
-from ..models import Summary, User
-from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Literal, Sequence
+from ..models import SEARCH_CONFIG, Comment, Summary, User
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncResult, AsyncSession
+from sqlalchemy import Select, func
+from sqlalchemy import delete as sa_delete
+from sqlalchemy import insert as sa_insert
 from sqlalchemy import select as sa_select
 from sqlalchemy import update as sa_update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased, joinedload, load_only, noload, selectinload
+from ..cache import summary_cache, user_cache
+from ..config import settings
+from ..db import any_of, violated_constraint
+from ..pagination import keyset, ranked_keyset
+from .counters import lock_users
 from ..schemas.summary import SummarySchemaCreate, SummarySchemaUpdate
 
 
-async def get_by_id(db: AsyncSession, summary_id: int | str) -> Summary | None:
-    return await db.get(Summary, summary_id)
+SummaryLoad = Literal["bare", "full"]
 
+RELATIONS = {
+    "user": joinedload(Summary.user),
+    "comments": selectinload(Summary.comments).joinedload(Comment.user),
+}
 
-async def get_all(db: AsyncSession, bound: int | None = None) -> Sequence[Summary]:
-    stmt = sa_select(Summary).limit(bound).order_by(Summary.id)
+LOADERS = {
+    "bare": (),
+    "full": tuple(RELATIONS.values()),
+}
+
+
+def sparse(fields: Sequence[str], include: Sequence[str]) -> tuple:
+    columns = (getattr(Summary, name) for name in fields)
+    return (load_only(Summary.id, *columns), *(RELATIONS[name] for name in include))
+
+
+async def get_by_id(
+    db: AsyncSession, summary_id: int | str, load: SummaryLoad | tuple = "full"
+) -> Summary | None:
+    options = LOADERS[load] if isinstance(load, str) else load
+    return await db.get(Summary, summary_id, options=options, populate_existing=True)
+
+
+async def get_all(
+    db: AsyncSession,
+    bound: int | None = None,
+    after: int | None = None,
+    before: int | None = None,
+    load: SummaryLoad | tuple = "full",
+) -> Sequence[Summary]:
+    options = LOADERS[load] if isinstance(load, str) else load
+    stmt = keyset(sa_select(Summary), Summary.id, bound, after, before)
+    summaries = (await db.execute(stmt.options(*options))).scalars().all()
+    return summaries[::-1] if before is not None else summaries
+
+
+async def get_many(
+    db: AsyncSession, ids: Sequence[int], load: SummaryLoad | tuple = "full"
+) -> Sequence[Summary]:
+    options = LOADERS[load] if isinstance(load, str) else load
+    stmt = sa_select(Summary).where(any_of(Summary.id, ids)).options(*options)
     return (await db.execute(stmt)).scalars().all()
 
 
+def version(summary: Summary) -> tuple:
+    # Must agree with `version_query` for a summary loaded with LOADERS["full"]
+    comments = summary.comments
+    return (
+        summary.id,
+        summary.updated_at,
+        summary.user.updated_at,
+        len(comments),
+        max((comment.updated_at for comment in comments), default=None),
+        max((comment.user.updated_at for comment in comments), default=None),
+    )
+
+
+def version_query() -> Select:
+    commenter = aliased(User)
+    comments = sa_select(Comment).where(Comment.summary_id == Summary.id)
+    return sa_select(
+        Summary.id,
+        Summary.updated_at,
+        sa_select(User.updated_at).where(User.id == Summary.user_id).scalar_subquery(),
+        comments.with_only_columns(func.count(Comment.id)).scalar_subquery(),
+        comments.with_only_columns(func.max(Comment.updated_at)).scalar_subquery(),
+        comments.join(commenter, Comment.user_id == commenter.id)
+        .with_only_columns(func.max(commenter.updated_at))
+        .scalar_subquery(),
+    )
+
+
+async def get_version(db: AsyncSession, summary_id: int) -> tuple | None:
+    row = (await db.execute(version_query().where(Summary.id == summary_id))).first()
+    return tuple(row) if row else None
+
+
+async def get_versions(
+    db: AsyncSession,
+    bound: int | None = None,
+    after: int | None = None,
+    before: int | None = None,
+) -> list[tuple]:
+    stmt = keyset(version_query(), Summary.id, bound, after, before)
+    rows = [tuple(row) for row in (await db.execute(stmt)).all()]
+    return rows[::-1] if before is not None else rows
+
+
+async def search(
+    db: AsyncSession,
+    terms: str,
+    bound: int | None = None,
+    after: tuple[float, int] | None = None,
+) -> Sequence[Row]:
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, terms)
+    rank = func.ts_rank(Summary.search_vector, query)
+    matches = sa_select(Summary.id, rank.label("rank")).where(
+        Summary.search_vector.bool_op("@@")(query)
+    )
+    page = ranked_keyset(matches, rank, Summary.id, bound, after).subquery()
+
+    # Headlines are costly, so they're only built for the rows of the page
+    headline = func.ts_headline(
+        SEARCH_CONFIG,
+        func.coalesce(Summary.description, Summary.title),
+        query,
+        "MaxFragments=2, MinWords=5, MaxWords=20",
+    )
+    stmt = (
+        sa_select(
+            Summary.id,
+            Summary.title,
+            Summary.description,
+            Summary.created_at,
+            Summary.updated_at,
+            page.c.rank,
+            headline.label("headline"),
+        )
+        .join(page, Summary.id == page.c.id)
+        .order_by(page.c.rank.desc(), Summary.id.desc())
+    )
+    return (await db.execute(stmt)).all()
+
+
+async def autocomplete(
+    db: AsyncSession,
+    term: str,
+    bound: int | None = None,
+    after: tuple[float, int] | None = None,
+) -> Sequence[Row]:
+    # %> is served by the trigram index and matches prefixes as well as typos
+    rank = func.word_similarity(term, Summary.title)
+    stmt = sa_select(
+        Summary.id, Summary.title, Summary.description, rank.label("rank")
+    ).where(Summary.title.bool_op("%>")(term))
+    stmt = ranked_keyset(stmt, rank, Summary.id, bound, after)
+    return (await db.execute(stmt)).all()
+
+
+async def stream_all(db: AsyncSession) -> AsyncResult:
+    stmt = (
+        sa_select(
+            Summary.id,
+            Summary.title,
+            Summary.description,
+            Summary.created_at,
+            Summary.updated_at,
+            Summary.user_id,
+        )
+        .order_by(Summary.id)
+        .execution_options(yield_per=settings.EXPORT_BATCH_SIZE)
+    )
+    return await db.stream(stmt)
+
+
 async def create(db: AsyncSession, summary: SummarySchemaCreate) -> Summary | None:
     payload = summary.dict(exclude_none=True, exclude_unset=True)
-    user = await db.get(User, payload["user_id"])
-    if not user:
-        return None
+    query = (
+        sa_insert(Summary)
+        .values(payload)
+        .returning(Summary)
+        .options(selectinload(Summary.user), noload(Summary.comments))
+    )
+    try:
+        db_summary = (await db.execute(query)).scalar_one()
+    except IntegrityError as error:
+        await db.rollback()
+        if violated_constraint(error) == "summaries_user_id_fkey":
+            return None
+        raise
 
-    db_summary = Summary(**payload)
-    db.add(db_summary)
     await db.commit()
-    await db.refresh(db_summary)
+    await user_cache.invalidate([db_summary.user_id])
     return db_summary
 
 
@@ -32,13 +199,42 @@ async def update(
     db: AsyncSession, payload: SummarySchemaUpdate, summary: Summary
 ) -> Summary:
     update_data = payload.dict(exclude_none=True, exclude_unset=True)
-    query = sa_update(Summary).where(Summary.id == summary.id).values(update_data)
-    await db.execute(query)
+    query = (
+        sa_update(Summary)
+        .where(Summary.id == summary.id)
+        .values(update_data)
+        .returning(Summary)
+        .options(
+            selectinload(Summary.user),
+            selectinload(Summary.comments).joinedload(Comment.user),
+        )
+        .execution_options(populate_existing=True)
+    )
+    summary = (await db.execute(query)).scalar_one()
     await db.commit()
-    await db.refresh(summary)
+    await summary_cache.invalidate([summary.id])
+    await user_cache.invalidate([summary.user_id])
     return summary
 
 
+async def commenter_ids(db: AsyncSession, summary_id: int) -> set[int]:
+    query = (
+        sa_select(Comment.user_id).where(Comment.summary_id == summary_id).distinct()
+    )
+    return set((await db.execute(query)).scalars().all())
+
+
 async def delete(db: AsyncSession, summary: Summary) -> None:
-    await db.delete(summary)
+    # Cascaded comments drop out of their authors' cached user responses
+    users = await commenter_ids(db, summary.id) | {summary.user_id}
+    await lock_users(db, users)
+    # ON DELETE CASCADE removes the comments, nothing gets loaded into the session
+    query = (
+        sa_delete(Summary)
+        .where(Summary.id == summary.id)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(query)
     await db.commit()
+    await summary_cache.invalidate([summary.id])
+    await user_cache.invalidate(users)
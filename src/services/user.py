@@ -1,19 +1,61 @@
-from typing import Sequence
-from ..models import User
+from typing import Literal, Sequence
+from ..enums import RoleEnum
+from ..cache import summary_cache, user_cache
+from ..models import Comment, Role, Summary, User
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import Select, func
+from sqlalchemy import delete as sa_delete
 from sqlalchemy import select as sa_select
 from sqlalchemy import update as sa_update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import joinedload, load_only, noload, raiseload, selectinload
+from ..db import any_of
+from .counters import lock_users
+from ..pagination import keyset, ranked_keyset
 from ..schemas.user import UserSchemaCreate, UserSchemaUpdate
-from ..security import get_password_hash, verify_password
+from ..security import password_hasher
 
 
-async def get_by_username(db: AsyncSession, username: str) -> User | None:
-    query = sa_select(User).where(User.username == username)
+UserLoad = Literal["bare", "summaries", "comments", "full"]
+
+RELATIONS = {
+    "role": joinedload(User.role),
+    "summaries": selectinload(User.summaries),
+    "comments": selectinload(User.comments),
+}
+
+LOADERS = {
+    "bare": (),
+    "summaries": (selectinload(User.summaries),),
+    "comments": (selectinload(User.comments).joinedload(Comment.summary),),
+    "full": (selectinload(User.summaries), selectinload(User.comments)),
+}
+
+
+def sparse(fields: Sequence[str], include: Sequence[str]) -> tuple:
+    columns = (getattr(User, name) for name in fields)
+    options = [load_only(User.id, *columns)]
+    options.extend(RELATIONS[name] for name in include)
+    if "role" not in include:
+        # The role is joined by default
+        options.append(raiseload(User.role))
+    return tuple(options)
+
+
+async def get_by_username(
+    db: AsyncSession, username: str, load: UserLoad | tuple = "full"
+) -> User | None:
+    options = LOADERS[load] if isinstance(load, str) else load
+    query = sa_select(User).where(User.username == username).options(*options)
     return (await db.execute(query)).scalar_one_or_none()
 
 
-async def get_by_id(db: AsyncSession, user_id: int | str) -> User | None:
-    return await db.get(User, user_id)
+async def get_by_id(
+    db: AsyncSession, user_id: int | str, load: UserLoad | tuple = "full"
+) -> User | None:
+    options = LOADERS[load] if isinstance(load, str) else load
+    return await db.get(User, user_id, options=options, populate_existing=True)
 
 
 async def get_with_paswd(
@@ -22,26 +64,108 @@ async def get_with_paswd(
     db_user = (
         await db.execute(sa_select(User).where((User.username == username)))
     ).scalar()
-    if not db_user or not verify_password(raw_password, db_user.hashed_password):
+    if not db_user or not await password_hasher.verify(
+        raw_password, db_user.hashed_password
+    ):
         return None
     return db_user
 
 
-async def get_all(db: AsyncSession, bound: int | None = None) -> Sequence[User]:
-    stmt = sa_select(User).limit(bound).order_by(User.id)
+async def get_all(
+    db: AsyncSession,
+    bound: int | None = None,
+    after: int | None = None,
+    before: int | None = None,
+    load: UserLoad | tuple = "full",
+) -> Sequence[User]:
+    options = LOADERS[load] if isinstance(load, str) else load
+    stmt = keyset(sa_select(User), User.id, bound, after, before)
+    users = (await db.execute(stmt.options(*options))).scalars().all()
+    return users[::-1] if before is not None else users
+
+
+async def get_many(
+    db: AsyncSession, ids: Sequence[int], load: UserLoad | tuple = "full"
+) -> Sequence[User]:
+    options = LOADERS[load] if isinstance(load, str) else load
+    stmt = sa_select(User).where(any_of(User.id, ids)).options(*options)
     return (await db.execute(stmt)).scalars().all()
 
 
+async def autocomplete(
+    db: AsyncSession,
+    term: str,
+    bound: int | None = None,
+    after: tuple[float, int] | None = None,
+) -> Sequence[Row]:
+    # %> is served by the trigram index and matches prefixes as well as typos
+    rank = func.word_similarity(term, User.username)
+    stmt = sa_select(
+        User.id, User.username, User.email, User.fio, rank.label("rank")
+    ).where(User.username.bool_op("%>")(term))
+    stmt = ranked_keyset(stmt, rank, User.id, bound, after)
+    return (await db.execute(stmt)).all()
+
+
+def version(user: User) -> tuple:
+    # Must agree with `version_query` for a user loaded with LOADERS["full"]
+    return (
+        user.id,
+        user.updated_at,
+        user.role_id,
+        len(user.summaries),
+        max((summary.updated_at for summary in user.summaries), default=None),
+        len(user.comments),
+        max((comment.updated_at for comment in user.comments), default=None),
+    )
+
+
+def version_query() -> Select:
+    summaries = sa_select(Summary).where(Summary.user_id == User.id)
+    comments = sa_select(Comment).where(Comment.user_id == User.id)
+    return sa_select(
+        User.id,
+        User.updated_at,
+        User.role_id,
+        summaries.with_only_columns(func.count(Summary.id)).scalar_subquery(),
+        summaries.with_only_columns(func.max(Summary.updated_at)).scalar_subquery(),
+        comments.with_only_columns(func.count(Comment.id)).scalar_subquery(),
+        comments.with_only_columns(func.max(Comment.updated_at)).scalar_subquery(),
+    )
+
+
+async def get_version(db: AsyncSession, user_id: int) -> tuple | None:
+    row = (await db.execute(version_query().where(User.id == user_id))).first()
+    return tuple(row) if row else None
+
+
+async def get_versions(
+    db: AsyncSession,
+    bound: int | None = None,
+    after: int | None = None,
+    before: int | None = None,
+) -> list[tuple]:
+    stmt = keyset(version_query(), User.id, bound, after, before)
+    rows = [tuple(row) for row in (await db.execute(stmt)).all()]
+    return rows[::-1] if before is not None else rows
+
+
 async def create(db: AsyncSession, user: UserSchemaCreate) -> User | None:
-    if await get_by_username(db, user.username):
-        return None
-    hashed_password = get_password_hash(user.password)
-    payload = user.dict()
-    del payload["password"]
-    db_user = User(**payload, hashed_password=hashed_password)
-    db.add(db_user)
+    payload = user.dict(exclude_none=True)
+    payload["hashed_password"] = await password_hasher.hash(payload.pop("password"))
+    # Everyone signs up as a user, admins are promoted out of band
+    role = sa_select(Role.id).where(Role.name == RoleEnum.user.name)
+    payload["role_id"] = role.scalar_subquery()
+
+    query = (
+        pg_insert(User)
+        .values(payload)
+        .on_conflict_do_nothing(index_elements=[User.username])
+        .returning(User)
+        .options(selectinload(User.role), noload(User.summaries), noload(User.comments))
+    )
+    db_user = (await db.execute(query)).scalar_one_or_none()
     await db.commit()
-    await db.refresh(db_user)
     return db_user
 
 
@@ -50,17 +174,66 @@ async def update(db: AsyncSession, payload: UserSchemaUpdate, user: User) -> Use
         exclude_none=True, exclude_unset=True, exclude_defaults=True
     )
     if update_data.get("password"):
-        hashed_passwd = get_password_hash(update_data.get("password"))
+        hashed_passwd = await password_hasher.hash(update_data.get("password"))
         update_data["hashed_password"] = hashed_passwd
         update_data.pop("password")
 
-    query = sa_update(User).where(User.username == user.username).values(update_data)
-    await db.execute(query)
+    query = (
+        sa_update(User)
+        .where(User.id == user.id)
+        .values(update_data)
+        .returning(User)
+        .options(selectinload(User.role), *LOADERS["full"])
+        .execution_options(populate_existing=True)
+    )
+    user = (await db.execute(query)).scalar_one()
     await db.commit()
-    await db.refresh(user)
+    await user_cache.invalidate([user.id])
+    await summary_cache.invalidate(await related_summary_ids(db, user.id))
     return user
 
 
+async def related_summary_ids(db: AsyncSession, user_id: int) -> set[int]:
+    # Summaries whose cached response embeds this user as author or commenter
+    query = sa_select(Summary.id).where(Summary.user_id == user_id)
+    query = query.union(sa_select(Comment.summary_id).where(Comment.user_id == user_id))
+    return set((await db.execute(query)).scalars().all())
+
+
+async def related_user_ids(db: AsyncSession, user_id: int) -> set[int]:
+    # Users who commented on summaries that are cascaded with this user
+    query = (
+        sa_select(Comment.user_id)
+        .join(Summary, Comment.summary_id == Summary.id)
+        .where(Summary.user_id == user_id)
+        .distinct()
+    )
+    return set((await db.execute(query)).scalars().all())
+
+
+async def commented_author_ids(db: AsyncSession, user_id: int) -> set[int]:
+    query = (
+        sa_select(Summary.user_id)
+        .join(Comment, Comment.summary_id == Summary.id)
+        .where(Comment.user_id == user_id)
+        .distinct()
+    )
+    return set((await db.execute(query)).scalars().all())
+
+
 async def delete(db: AsyncSession, user: User) -> None:
-    await db.delete(user)
+    summaries = await related_summary_ids(db, user.id)
+    users = await related_user_ids(db, user.id) | {user.id}
+    # Summaries this user commented on lose comments, locking their authors
+    # orders those updates as well
+    await lock_users(db, users | await commented_author_ids(db, user.id), user.id)
+    # ON DELETE CASCADE removes summaries and comments, nothing gets loaded
+    query = (
+        sa_delete(User)
+        .where(User.id == user.id)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(query)
     await db.commit()
+    await summary_cache.invalidate(summaries)
+    await user_cache.invalidate(users)
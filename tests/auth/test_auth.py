@@ -139,4 +139,34 @@ async def test_get_current_user(client: AsyncClient, create_user, authorization_
 
     response = await client.get("/users/me", headers=authorization_header)
     assert response.status_code == 200
-    assert exact_schema(user)
+    assert exact_schema(user) == response.json()
+
+
+@pytest.mark.asyncio
+async def test_logout_revokes_token(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to use access token after log out
+    """
+    response = await client.delete("/auth/logout", headers=authorization_header)
+    assert response.status_code == 200
+
+    response = await client.get("/users/me", headers=authorization_header)
+    assert response.status_code == 401
+    assert response.json().get("detail") == "Token has been revoked"
+
+
+@pytest.mark.asyncio
+async def test_refresh_revokes_refresh_token(
+    client: AsyncClient, create_user, authorize
+):
+    """
+    Trying to refresh access token twice with the same refresh token
+    """
+    headers = {"Authorization": f'Bearer {authorize["refresh_token"]}'}
+    response = await client.post("/auth/refresh", headers=headers)
+    assert response.status_code == 200
+
+    response = await client.post("/auth/refresh", headers=headers)
+    assert response.status_code == 401
@@ -5,14 +5,20 @@ from contextlib import ExitStack
 from sqlalchemy import text
 import pytest_asyncio
 from src import init_app
+from src.config import settings
 from src.db import get_db, session_manager
 from httpx import AsyncClient
 from pytest_postgresql import factories
 from pytest_postgresql.janitor import DatabaseJanitor
 from src.enums import RoleEnum
+from src.redis import RedisClient
 
 
 user_data = {"username": "username", "password": "password"}
+admin_data = {"username": "admin", "password": "password"}
+
+# Any request issuing more queries fails its test, so N+1 regressions surface
+settings.DB_QUERY_BUDGET = 8
 
 
 @pytest.fixture(autouse=True)
@@ -55,7 +61,7 @@ async def connection_test(test_db, event_loop):
 
 
 @pytest_asyncio.fixture(autouse=True)
-async def create_tables(connection_test):
+async def create_tables(app, connection_test):
     async with session_manager.connect() as connection:
         await session_manager.drop_all(connection)
         await session_manager.create_all(connection)
@@ -65,6 +71,8 @@ async def create_tables(connection_test):
         )
         for role in roles:
             await connection.execute(stmt, role)
+    # Cached responses and revoked tokens must not leak between tests
+    RedisClient().clear()
 
 
 @pytest_asyncio.fixture(autouse=True)
@@ -91,3 +99,22 @@ async def authorize(client: AsyncClient) -> dict[str, str]:
 @pytest_asyncio.fixture
 async def authorization_header(authorize):
     return {"Authorization": f'Bearer {authorize["access_token"]}'}
+
+
+@pytest_asyncio.fixture
+async def admin_header(client: AsyncClient) -> dict[str, str]:
+    await client.post("/users", json=admin_data)
+    # Registration always grants the user role, admins are seeded directly
+    async with session_manager.connect() as connection:
+        await connection.execute(
+            text(
+                "UPDATE users SET role_id = (SELECT id FROM roles WHERE name = :role)"
+                " WHERE username = :username"
+            ),
+            {"role": RoleEnum.admin.name, "username": admin_data["username"]},
+        )
+    response = await client.post(
+        "/auth/login",
+        json={"username": admin_data["username"], "password": admin_data["password"]},
+    )
+    return {"Authorization": f'Bearer {response.json()["access_token"]}'}
@@ -6,6 +6,7 @@ summary = {
     "description": Or(str, None),
     "created_at": str,
     "updated_at": str,
+    "comment_count": int,
     "user": {
         "id": int,
         "username": str,
@@ -39,3 +40,32 @@ user_summaries = [
         "updated_at": str,
     }
 ]
+
+comment = {
+    "id": int,
+    "text": str,
+    "created_at": str,
+    "updated_at": str,
+    "user": {
+        "id": int,
+        "username": str,
+        "email": Or(Regex(r".*?@.*?\.[A-Za-z]{2,6}"), None),
+        "fio": Or(str, None),
+    },
+    "summary": {
+        "id": int,
+        "title": str,
+        "description": Or(str, None),
+    },
+}
+
+summary_search = [
+    {
+        "id": int,
+        "title": str,
+        "description": Or(str, None),
+        "created_at": str,
+        "updated_at": str,
+        "headline": str,
+    }
+]
@@ -0,0 +1,98 @@
+import pytest
+from httpx import AsyncClient
+from pytest_schema import exact_schema
+from src.routers import comment as comment_router
+from .schemas import comment
+
+
+summary_data = {
+    "title": "First Summary",
+    "description": "It's description",
+    "user_id": 1,
+}
+
+
+@pytest.mark.asyncio
+async def test_batch_comments(client: AsyncClient, create_user, authorization_header):
+    """
+    Trying to create, update and delete comments in batches
+    """
+    await client.post("/summaries", json=summary_data, headers=authorization_header)
+    await client.post("/users", json={"username": "other", "password": "password"})
+
+    response = await client.post(
+        "/comments/batch",
+        json=[
+            {"text": "first", "user_id": 1, "summary_id": 1},
+            {"text": "second", "user_id": 1, "summary_id": 7},
+            {"text": "third", "user_id": 2, "summary_id": 1},
+            {"text": "first", "user_id": 1, "summary_id": 1},
+        ],
+        headers=authorization_header,
+    )
+    assert response.status_code == 200
+    first, missing, foreign, duplicate = response.json()
+    assert first["status"] == 201
+    assert exact_schema(comment) == first["comment"]
+    assert missing == {"status": 400, "detail": "Summary not found"}
+    assert foreign["status"] == 405
+    assert duplicate["status"] == 201
+    assert duplicate["comment"]["id"] != first["comment"]["id"]
+
+    response = await client.patch(
+        "/comments/batch",
+        json=[{"id": 1, "text": "edited"}, {"id": 9, "text": "edited"}],
+        headers=authorization_header,
+    )
+    assert response.status_code == 200
+    edited, missing = response.json()
+    assert edited["comment"]["text"] == "edited"
+    assert missing == {"id": 9, "status": 404, "detail": "Comment not found"}
+
+    response = await client.patch(
+        "/comments/batch",
+        json=[{"id": 1, "text": "once"}, {"id": 1, "text": "twice"}],
+        headers=authorization_header,
+    )
+    assert response.status_code == 400
+    assert response.json().get("detail") == "Duplicate ids"
+
+    response = await client.delete(
+        "/comments/batch?ids=1,2,9", headers=authorization_header
+    )
+    assert [item["status"] for item in response.json()] == [204, 204, 404]
+
+    response = await client.get("/summaries/1", headers=authorization_header)
+    assert response.json()["comments"] == []
+
+
+@pytest.mark.asyncio
+async def test_batch_update_deleted_comment(
+    client: AsyncClient, create_user, authorization_header, monkeypatch
+):
+    """
+    Trying to update a comment deleted after its owner was checked
+    """
+    await client.post("/summaries", json=summary_data, headers=authorization_header)
+    await client.post("/comments", json={"text": "text", "user_id": 1, "summary_id": 1})
+    get_owners = comment_router.get_owners
+
+    async def stale_owners(db, ids):
+        return {**await get_owners(db, ids), 9: 1}
+
+    monkeypatch.setattr(comment_router, "get_owners", stale_owners)
+    response = await client.patch(
+        "/comments/batch",
+        json=[{"id": 1, "text": "edited"}, {"id": 9, "text": "edited"}],
+        headers=authorization_header,
+    )
+    assert [item["status"] for item in response.json()] == [200, 404]
+
+
+@pytest.mark.asyncio
+async def test_batch_comments_unauthorized(client: AsyncClient, create_user):
+    """
+    Trying to modify comments in batches unauthorized
+    """
+    response = await client.delete("/comments/batch?ids=1")
+    assert response.status_code == 401
@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from httpx import AsyncClient
+from pytest_schema import exact_schema
+from sqlalchemy import text
+from src.db import session_manager
+from .schemas import comment
+
+
+summary_data = {
+    "title": "First Summary",
+    "description": "It's description",
+    "user_id": 1,
+}
+
+
+def parse_date(value: str) -> datetime:
+    return datetime.strptime(value, "%H:%M:%S %d.%m.%Y %Z").replace(tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+async def test_create_comment(client: AsyncClient, create_user, authorization_header):
+    """
+    Trying to create comments with existing and missing references
+    """
+    await client.post("/summaries", json=summary_data, headers=authorization_header)
+
+    response = await client.post(
+        "/comments", json={"text": "text", "user_id": 1, "summary_id": 1}
+    )
+    assert response.status_code == 201
+    assert exact_schema(comment) == response.json()
+
+    response = await client.post(
+        "/comments", json={"text": "text", "user_id": 42, "summary_id": 1}
+    )
+    assert response.status_code == 400
+    assert response.json().get("detail") == "User not found"
+
+    response = await client.post(
+        "/comments", json={"text": "text", "user_id": 1, "summary_id": 42}
+    )
+    assert response.status_code == 400
+    assert response.json().get("detail") == "Summary not found"
+
+
+@pytest.mark.asyncio
+async def test_update_comment(client: AsyncClient, create_user, authorization_header):
+    """
+    Trying to update comment and get the updated row back
+    """
+    await client.post("/summaries", json=summary_data, headers=authorization_header)
+    await client.post("/comments", json={"text": "text", "user_id": 1, "summary_id": 1})
+    async with session_manager.connect() as connection:
+        await connection.execute(
+            text("UPDATE comments SET updated_at = now() - interval '1 day'")
+        )
+
+    started = datetime.now(timezone.utc).replace(microsecond=0)
+    response = await client.patch(
+        "/comments/1", json={"text": "new text"}, headers=authorization_header
+    )
+    assert response.status_code == 200
+    assert exact_schema(comment) == response.json()
+    assert response.json()["text"] == "new text"
+    updated_at = parse_date(response.json()["updated_at"])
+    assert started <= updated_at <= started + timedelta(minutes=1)
+
+    response = await client.get("/comments/1", headers=authorization_header)
+    assert response.json()["text"] == "new text"
+    assert parse_date(response.json()["updated_at"]) == updated_at
@@ -39,6 +39,20 @@ async def test_create_summary_authorized(
     assert exact_schema(user_summaries) == response.json()
 
 
+@pytest.mark.asyncio
+async def test_create_summary_missing_user(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to create summary of a user that doesn't exist
+    """
+    response = await client.post(
+        "/summaries", json={**summary_data, "user_id": 42}, headers=authorization_header
+    )
+    assert response.status_code == 400
+    assert response.json().get("detail") == "User not found"
+
+
 @pytest.mark.asyncio
 async def test_create_couple_summaries(
     client: AsyncClient, create_user, authorization_header
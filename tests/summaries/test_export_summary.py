@@ -0,0 +1,82 @@
+import csv
+import json
+from datetime import datetime
+import pytest
+from httpx import AsyncClient
+
+
+summary_data = {
+    "title": "First Summary",
+    "description": "It's description",
+    "user_id": 1,
+}
+
+
+@pytest.mark.asyncio
+async def test_export_summaries_unauthorized(client: AsyncClient, create_user):
+    """
+    Trying to export summaries unauthorized
+    """
+    response = await client.get("/summaries/export")
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_export_summaries_ndjson(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to export summaries as NDJSON
+    """
+    for _ in range(3):
+        await client.post("/summaries", json=summary_data, headers=authorization_header)
+
+    response = await client.get("/summaries/export", headers=authorization_header)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [1, 2, 3]
+    assert set(rows[0]) == {
+        "id",
+        "title",
+        "description",
+        "created_at",
+        "updated_at",
+        "user_id",
+    }
+    assert datetime.fromisoformat(rows[0]["created_at"]).utcoffset() is not None
+
+
+@pytest.mark.asyncio
+async def test_export_summaries_csv(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to export summaries as CSV
+    """
+    await client.post("/summaries", json=summary_data, headers=authorization_header)
+
+    response = await client.get(
+        "/summaries/export?format=csv", headers=authorization_header
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(response.text.splitlines()))
+    assert len(rows) == 1
+    assert rows[0]["title"] == "First Summary"
+
+
+@pytest.mark.asyncio
+async def test_export_comments_empty(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to export comments when there are none
+    """
+    response = await client.get(
+        "/comments/export?format=csv", headers=authorization_header
+    )
+    assert response.status_code == 200
+    assert response.text.splitlines() == [
+        "id,text,created_at,updated_at,user_id,summary_id"
+    ]
@@ -0,0 +1,96 @@
+import json
+import pytest
+from httpx import AsyncClient
+
+
+def ndjson(*rows) -> str:
+    return "\n".join(row if isinstance(row, str) else json.dumps(row) for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_import_summaries_not_admin(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to import summaries as a regular user
+    """
+    response = await client.post(
+        "/summaries/import",
+        content=ndjson({"title": "Title", "description": None, "user_id": 1}),
+        headers=authorization_header,
+    )
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_import_summaries(client: AsyncClient, admin_header):
+    """
+    Trying to import summaries with some broken rows
+    """
+    body = ndjson(
+        {"title": "First Summary", "description": "It's description", "user_id": 1},
+        "not json",
+        {"title": "S", "user_id": 1},
+        {"title": "Orphan Summary", "description": None, "user_id": 42},
+        {"title": "Second Summary", "description": None, "user_id": 1},
+    )
+    response = await client.post(
+        "/summaries/import",
+        content=body.encode() + b'\n{"title": "\xff"}',
+        headers=admin_header,
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["imported"] == 2
+    assert report["failed"] == 4
+    # A batch reports its unparsable lines before the rows COPY rejected
+    assert [error["line"] for error in report["errors"]] == [2, 3, 6, 4]
+    assert report["errors"][2]["detail"] == "Invalid JSON"
+    assert report["errors"][3]["detail"] == "User not found"
+
+    response = await client.get("/summaries", headers=admin_header)
+    assert [summary["title"] for summary in response.json()] == [
+        "First Summary",
+        "Second Summary",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_import_comments(client: AsyncClient, admin_header):
+    """
+    Trying to import comments
+    """
+    response = await client.get("/users/1", headers=admin_header)
+    assert response.json()["summary_count"] == 0
+    await client.post(
+        "/summaries/import",
+        content=ndjson({"title": "Summary", "description": None, "user_id": 1}),
+        headers=admin_header,
+    )
+    # Imports drop the cached responses they change
+    response = await client.get("/users/1", headers=admin_header)
+    assert response.json()["summary_count"] == 1
+    etag = (await client.get("/summaries/1", headers=admin_header)).headers["ETag"]
+
+    body = ndjson(
+        {"text": "First comment", "user_id": 1, "summary_id": 1},
+        {"text": "Lost comment", "user_id": 1, "summary_id": 7},
+    )
+    response = await client.post("/comments/import", content=body, headers=admin_header)
+    assert response.status_code == 200
+    assert response.json() == {
+        "imported": 1,
+        "failed": 1,
+        "errors": [{"line": 2, "detail": "Summary not found"}],
+    }
+
+    response = await client.get(
+        "/summaries/1", headers={**admin_header, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["comment_count"] == 1
+    assert [comment["text"] for comment in response.json()["comments"]] == [
+        "First comment"
+    ]
+    response = await client.get("/users/1", headers=admin_header)
+    assert response.json()["comment_count"] == 1
@@ -0,0 +1,173 @@
+import pytest
+from httpx import AsyncClient
+from pytest_schema import exact_schema
+from sqlalchemy import text
+from src.db import session_manager
+from src.services.counters import backfill
+from .schemas import summary
+
+
+summary_data = {
+    "title": "First Summary",
+    "description": "It's description",
+    "user_id": 1,
+}
+
+
+@pytest.mark.asyncio
+async def test_read_summary_not_modified(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to revalidate summary before and after a new comment
+    """
+    await client.post("/summaries", json=summary_data, headers=authorization_header)
+    response = await client.get("/summaries/1", headers=authorization_header)
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "MISS"
+    etag = response.headers["ETag"]
+
+    conditional_header = {**authorization_header, "If-None-Match": etag}
+    response = await client.get("/summaries/1", headers=conditional_header)
+    assert response.status_code == 304
+
+    await client.post(
+        "/comments", json={"text": "comment", "user_id": 1, "summary_id": 1}
+    )
+    response = await client.get("/summaries/1", headers=conditional_header)
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.headers["ETag"] != etag
+    assert len(response.json()["comments"]) == 1
+    assert exact_schema(summary) == response.json()
+
+    response = await client.get("/summaries/1", headers=authorization_header)
+    assert response.headers["X-Cache"] == "HIT"
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_read_summaries_sparse_fields(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to read summaries with fields and include parameters
+    """
+    await client.post("/summaries", json=summary_data, headers=authorization_header)
+    await client.post(
+        "/comments", json={"text": "comment", "user_id": 1, "summary_id": 1}
+    )
+
+    response = await client.get(
+        "/summaries?fields=title,id&include=", headers=authorization_header
+    )
+    assert response.status_code == 200
+    assert response.json() == [{"id": 1, "title": "First Summary"}]
+
+    response = await client.get(
+        "/summaries/1?fields=title&include=user", headers=authorization_header
+    )
+    assert response.status_code == 200
+    assert list(response.json()) == ["title", "user"]
+    assert response.json()["user"]["username"] == "username"
+    etag = response.headers["ETag"]
+
+    response = await client.get(
+        "/summaries/1", headers={**authorization_header, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+    response = await client.get(
+        "/summaries?fields=rating&include=users", headers=authorization_header
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_read_summaries_by_ids(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to fetch several summaries at once keeping the requested order
+    """
+    for title in ("First Summary", "Second Summary"):
+        await client.post(
+            "/summaries",
+            json={**summary_data, "title": title},
+            headers=authorization_header,
+        )
+
+    response = await client.get("/summaries?ids=2,7,1", headers=authorization_header)
+    assert response.status_code == 200
+    first, missing, second = response.json()
+    assert first["title"] == "Second Summary"
+    assert missing == {"id": 7, "detail": "Summary not found"}
+    assert second["title"] == "First Summary"
+    assert exact_schema(summary) == first
+
+    response = await client.get("/summaries?ids=1,a", headers=authorization_header)
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_read_summary_comment_count(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to read comment counters after comments come and go
+    """
+    await client.post("/summaries", json=summary_data, headers=authorization_header)
+    await client.post(
+        "/comments", json={"text": "comment", "user_id": 1, "summary_id": 1}
+    )
+    await client.post(
+        "/comments/batch",
+        json=[
+            {"text": f"comment {i}", "user_id": 1, "summary_id": 1} for i in range(2)
+        ],
+        headers=authorization_header,
+    )
+    await client.delete("/comments/2", headers=authorization_header)
+
+    response = await client.get(
+        "/summaries/1?fields=comment_count&include=", headers=authorization_header
+    )
+    assert response.json() == {"comment_count": 2}
+    response = await client.get(
+        "/users/1?fields=summary_count,comment_count&include=",
+        headers=authorization_header,
+    )
+    assert response.json() == {"summary_count": 1, "comment_count": 2}
+
+    await client.delete("/summaries/1", headers=authorization_header)
+    response = await client.get("/users/1", headers=authorization_header)
+    assert response.json()["summary_count"] == 0
+    assert response.json()["comment_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_backfill_comment_count(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to repair drifted counters with the backfill
+    """
+    await client.post("/summaries", json=summary_data, headers=authorization_header)
+    await client.post(
+        "/comments", json={"text": "comment", "user_id": 1, "summary_id": 1}
+    )
+    response = await client.get("/summaries/1", headers=authorization_header)
+    assert response.json()["comment_count"] == 1
+
+    async with session_manager.session() as db:
+        await db.execute(text("UPDATE summaries SET comment_count = 7"))
+        await db.execute(text("UPDATE users SET summary_count = 0"))
+        await db.commit()
+        assert await backfill(db) == {"summaries": 1, "users": 1}
+        assert await backfill(db) == {"summaries": 0, "users": 0}
+
+    response = await client.get("/summaries/1", headers=authorization_header)
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.json()["comment_count"] == 1
+    response = await client.get("/users/1", headers=authorization_header)
+    assert response.json()["summary_count"] == 1
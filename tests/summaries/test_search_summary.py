@@ -0,0 +1,89 @@
+import pytest
+from httpx import AsyncClient
+from pytest_schema import exact_schema
+from .schemas import summary_search
+
+
+summaries_data = [
+    {"title": "Postgres tuning", "description": "Notes on vacuum and indexes"},
+    {"title": "Cooking", "description": "Tuning a postgres server for reads"},
+    {"title": "Gardening", "description": "Soil, seeds and water"},
+]
+
+
+@pytest.mark.asyncio
+async def test_search_summaries(client: AsyncClient, create_user, authorization_header):
+    """
+    Trying to search summaries by title and description
+    """
+    for data in summaries_data:
+        await client.post(
+            "/summaries", json={**data, "user_id": 1}, headers=authorization_header
+        )
+
+    response = await client.get(
+        "/summaries/search?q=postgres tuning", headers=authorization_header
+    )
+    assert response.status_code == 200
+    assert exact_schema(summary_search) == response.json()
+    # Title matches weigh more than description matches
+    assert [item["id"] for item in response.json()] == [1, 2]
+    assert "<b>" in response.json()[1]["headline"]
+
+    response = await client.get(
+        "/summaries/search?q=postgres&limit=1", headers=authorization_header
+    )
+    assert [item["id"] for item in response.json()] == [1]
+    next_url = response.headers["Link"].split(";")[0].strip("<>")
+
+    response = await client.get(next_url, headers=authorization_header)
+    assert [item["id"] for item in response.json()] == [2]
+
+    response = await client.get(
+        "/summaries/search?q=-postgres", headers=authorization_header
+    )
+    assert [item["id"] for item in response.json()] == [3]
+
+
+@pytest.mark.asyncio
+async def test_search_summaries_invalid_cursor(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to search summaries with a malformed cursor
+    """
+    response = await client.get(
+        "/summaries/search?q=postgres&after=bm9wZQ", headers=authorization_header
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_summaries(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to autocomplete summary titles by prefix and with a typo
+    """
+    for data in summaries_data:
+        await client.post(
+            "/summaries", json={**data, "user_id": 1}, headers=authorization_header
+        )
+
+    response = await client.get(
+        "/summaries/autocomplete?q=postg", headers=authorization_header
+    )
+    assert response.status_code == 200
+    assert response.json() == [
+        {
+            "id": 1,
+            "title": "Postgres tuning",
+            "description": "Notes on vacuum and indexes",
+        }
+    ]
+
+    response = await client.get(
+        "/summaries/autocomplete?q=gardenign", headers=authorization_header
+    )
+    assert [item["id"] for item in response.json()] == [3]
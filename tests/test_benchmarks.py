@@ -0,0 +1,76 @@
+import pytest
+from benchmarks.datagen import Dataset
+from benchmarks.micro import measure
+from benchmarks.report import compare, compare_cases, percentile, summarize
+
+
+def test_dataset_is_seeded():
+    """
+    Testing the same seed generates the same rows
+    """
+    first = Dataset(20, 50, 200, seed=1).rows(user_role=1, admin_role=2)
+    second = Dataset(20, 50, 200, seed=1).rows(user_role=1, admin_role=2)
+    other = Dataset(20, 50, 200, seed=2).rows(user_role=1, admin_role=2)
+
+    def strip(rows):
+        # The password hash is salted, everything else must match
+        return [row[:1] + row[2:] for row in rows]
+
+    assert strip(first["users"]) == strip(second["users"])
+    assert first["summaries"] == second["summaries"]
+    assert first["comments"] == second["comments"]
+    assert first["comments"] != other["comments"]
+    assert [len(first[table]) for table in ("users", "summaries", "comments")] == [
+        20,
+        50,
+        200,
+    ]
+    assert {row[2] for row in first["summaries"]} <= set(range(1, 21))
+    assert {row[2] for row in first["comments"]} <= set(range(1, 51))
+
+
+def test_compare_reports():
+    """
+    Testing percentiles and p95 regressions between two reports
+    """
+    assert percentile([1, 2, 3, 4], 50) == 2
+    assert percentile([1, 2, 3, 4], 99) == 4
+
+    def report(latencies):
+        return {
+            "dataset": {"seed": 42},
+            "scenarios": {
+                "feed_reads": summarize(latencies, {200: len(latencies), 500: 1}, 1, 1)
+            },
+        }
+
+    old = report([0.01] * 100)
+    assert old["scenarios"]["feed_reads"]["errors"] == 1
+    assert compare(old, report([0.0105] * 100), threshold=10)[1] is False
+    lines, regressed = compare(old, report([0.02] * 100), threshold=10)
+    assert regressed is True
+    assert "REGRESSED +100% p95" in lines[0]
+
+
+@pytest.mark.asyncio
+async def test_compare_micro_reports():
+    """
+    Testing micro benchmark statistics and time and memory regressions
+    """
+    stats = await measure(lambda: [0] * 1000, max_time=0)
+    assert stats["rounds"] >= 5
+    assert stats["min_ms"] <= stats["median_ms"]
+    assert stats["peak_kib"] > 0
+
+    def report(median_ms, peak_kib):
+        case = {"median_ms": median_ms, "peak_kib": peak_kib}
+        return {"python": "3.11", "cases": {"serialize": case}}
+
+    old = report(1.0, 100)
+    assert compare_cases(old, report(1.05, 105), 10, 10)[1] is False
+    lines, regressed = compare_cases(old, report(1.0, 150), 10, 10)
+    assert regressed is True
+    assert "REGRESSED +50% memory" in lines[0]
+    lines, regressed = compare_cases(old, report(2.0, 100), 10, 10)
+    assert regressed is True
+    assert "REGRESSED +100% time" in lines[0]
@@ -0,0 +1,24 @@
+import pytest
+from src.config import settings
+from src.db import DatabaseSessionManager, session_manager
+
+
+@pytest.mark.asyncio
+async def test_pool_stats():
+    """
+    Testing pool statistics follow connections being checked out and returned
+    """
+    before = session_manager.pool_stats()
+    assert before["size"] == settings.DB_POOL_SIZE
+
+    async with session_manager.connect(), session_manager.connect():
+        during = session_manager.pool_stats()
+        assert during["checked_out"] == before["checked_out"] + 2
+
+    after = session_manager.pool_stats()
+    assert after["checked_out"] == before["checked_out"]
+    assert after["idle"] >= 2
+    assert after["overflow"] >= 0
+
+    with pytest.raises(Exception):
+        DatabaseSessionManager().pool_stats()
@@ -0,0 +1,48 @@
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_metrics(client: AsyncClient, create_user, authorization_header):
+    """
+    Testing request, pool, cache and password hasher metrics
+    """
+    await client.get("/users/1", headers=authorization_header)
+    await client.get("/users/1")
+    await client.get("/missing")
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["Content-Type"].startswith("text/plain")
+    lines = response.text.splitlines()
+    assert any(
+        line.startswith(
+            'http_requests_total{method="GET",route="/users/{user_id}",status="200"}'
+        )
+        for line in lines
+    )
+    assert any(
+        line.startswith(
+            'http_requests_total{method="GET",route="/users/{user_id}",status="401"}'
+        )
+        for line in lines
+    )
+    assert any(
+        line.startswith('http_requests_total{method="GET",route="unmatched"')
+        for line in lines
+    )
+    assert any(
+        line.startswith(
+            'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/users/{user_id}"}'
+        )
+        for line in lines
+    )
+    assert 'http_requests_in_flight{method="GET"} 1.0' in lines
+    assert 'password_hasher_tasks{state="queued"} 0.0' in lines
+    assert any(
+        line.startswith('response_cache_lookups_total{namespace="user",result="miss"}')
+        for line in lines
+    )
+    assert any(line.startswith('db_pool_connections{state="size"}') for line in lines)
+    # Every request has returned its connection by the time of the scrape
+    assert 'db_pool_connections{state="checked_out"} 0.0' in lines
@@ -0,0 +1,65 @@
+import marshal
+import pytest
+from httpx import AsyncClient
+from src import profiling
+
+
+@pytest.mark.asyncio
+async def test_profile_request(client: AsyncClient, admin_header):
+    """
+    Testing a request profiled on demand by an admin
+    """
+    response = await client.get("/users/1", headers={**admin_header, "X-Profile": "1"})
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+
+    response = await client.get("/profiles", headers=admin_header)
+    assert response.status_code == 200
+    assert response.json()[0]["id"] == profile_id
+    assert response.json()[0]["path"] == "/users/1"
+    assert response.json()[0]["wall_ms"] >= response.json()[0]["cpu_ms"] >= 0
+
+    response = await client.get(f"/profiles/{profile_id}", headers=admin_header)
+    assert response.status_code == 200
+    assert response.text.startswith("GET /users/1 200 wall")
+    assert "function calls" in response.text
+
+    response = await client.get(
+        f"/profiles/{profile_id}?format=pstats", headers=admin_header
+    )
+    assert isinstance(marshal.loads(response.content), dict)
+
+    response = await client.get("/profiles/missing", headers=admin_header)
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_profile_save_failure(client: AsyncClient, admin_header, monkeypatch):
+    """
+    Testing a profile that can't be saved doesn't fail the profiled request
+    """
+
+    async def fail(*args):
+        raise ConnectionError("Redis is down")
+
+    monkeypatch.setattr(profiling, "save_profile", fail)
+    response = await client.get("/users/1", headers={**admin_header, "X-Profile": "1"})
+    assert response.status_code == 200
+    assert "X-Profile-Id" in response.headers
+
+
+@pytest.mark.asyncio
+async def test_profile_request_not_admin(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to profile a request and read profiles as a regular user
+    """
+    response = await client.get(
+        "/users/1", headers={**authorization_header, "X-Profile": "1"}
+    )
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+
+    response = await client.get("/profiles", headers=authorization_header)
+    assert response.status_code == 403
@@ -0,0 +1,111 @@
+import pytest
+from httpx import AsyncClient
+from src.config import settings
+from src.querystats import QueryBudgetExceeded
+
+
+@pytest.mark.asyncio
+async def test_server_timing(client: AsyncClient, create_user, authorization_header):
+    """
+    Testing the database timing reported for a request
+    """
+    response = await client.get("/users/1", headers=authorization_header)
+    assert response.status_code == 200
+    metric, duration, description = response.headers["Server-Timing"].split(";")
+    assert metric == "db"
+    assert float(duration.removeprefix("dur=")) > 0
+    assert description.startswith('desc="') and description.endswith(' queries"')
+
+
+@pytest.mark.asyncio
+async def test_current_user_queries(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Testing /users/me loads the user's relations in bounded queries
+    """
+    await client.post(
+        "/summaries",
+        json={"title": "Summary", "description": None, "user_id": 1},
+        headers=authorization_header,
+    )
+    for number in range(5):
+        await client.post(
+            "/comments",
+            json={"text": f"Comment {number}", "user_id": 1, "summary_id": 1},
+            headers=authorization_header,
+        )
+
+    response = await client.get("/users/me", headers=authorization_header)
+    assert response.status_code == 200
+    assert len(response.json()["comments"]) == 5
+    # The user with its role, then its summaries and its comments
+    assert response.headers["Server-Timing"].endswith('desc="3 queries"')
+
+    response = await client.get(
+        "/users/me?fields=id,username&include=", headers=authorization_header
+    )
+    assert response.json() == {"id": 1, "username": "username"}
+    assert response.headers["Server-Timing"].endswith('desc="1 queries"')
+
+
+@pytest.mark.asyncio
+async def test_query_budget(
+    client: AsyncClient, create_user, authorization_header, monkeypatch
+):
+    """
+    Testing a request going over the query budget
+    """
+    monkeypatch.setattr(settings, "DB_QUERY_BUDGET", 1)
+    with pytest.raises(QueryBudgetExceeded):
+        await client.get("/users/1", headers=authorization_header)
+
+
+@pytest.mark.asyncio
+async def test_update_queries(client: AsyncClient, create_user, authorization_header):
+    """
+    Testing updates don't load relations before the UPDATE ... RETURNING
+    """
+    await client.post(
+        "/summaries",
+        json={"title": "Summary", "description": None, "user_id": 1},
+        headers=authorization_header,
+    )
+    for number in range(5):
+        await client.post(
+            "/comments",
+            json={"text": f"Comment {number}", "user_id": 1, "summary_id": 1},
+            headers=authorization_header,
+        )
+
+    # The owner check, the UPDATE, then one query per relation in the response
+    for path, payload, queries in (
+        # plus the ids of summaries whose cached responses embed the user
+        ("/users/1", {"fio": "Fio Fio"}, 6),
+        ("/summaries/1", {"title": "New title"}, 4),
+        ("/comments/1", {"text": "New text"}, 4),
+    ):
+        response = await client.patch(path, json=payload, headers=authorization_header)
+        assert response.status_code == 200
+        assert response.headers["Server-Timing"].endswith(f'desc="{queries} queries"')
+
+    response = await client.get("/users/1", headers=authorization_header)
+    assert response.json()["fio"] == "Fio Fio"
+    assert len(response.json()["comments"]) == 5
+    assert response.json()["summaries"][0]["title"] == "New title"
+
+
+@pytest.mark.asyncio
+async def test_create_user_queries(client: AsyncClient):
+    """
+    Testing registration is a single INSERT, taken or not
+    """
+    user_data = {"username": "username", "password": "password"}
+    response = await client.post("/users", json=user_data)
+    assert response.status_code == 201
+    # The INSERT ... RETURNING, then the new user's role
+    assert response.headers["Server-Timing"].endswith('desc="2 queries"')
+
+    response = await client.post("/users", json=user_data)
+    assert response.status_code == 400
+    assert response.headers["Server-Timing"].endswith('desc="1 queries"')
@@ -0,0 +1,58 @@
+import asyncio
+import threading
+import time
+import pytest
+import src.security
+from src.security import PasswordHasher, pwd_context
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_bcrypt():
+    """
+    Testing hashes from the executor are plain bcrypt hashes
+    """
+    hasher = PasswordHasher(2, "thread")
+    try:
+        hashed_password = await hasher.hash("password")
+        assert pwd_context.identify(hashed_password) == "bcrypt"
+        assert pwd_context.verify("password", hashed_password)
+        assert await hasher.verify("password", hashed_password) is True
+        assert await hasher.verify("wrong password", hashed_password) is False
+    finally:
+        hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_password_hasher_concurrency(monkeypatch):
+    """
+    Testing no more than `workers` hashes run at once and cancelled ones never start
+    """
+    lock = threading.Lock()
+    running, peak, started = 0, 0, []
+
+    def slow_hash(raw_password):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+            started.append(raw_password)
+        time.sleep(0.05)
+        with lock:
+            running -= 1
+        return raw_password
+
+    monkeypatch.setattr(src.security, "get_password_hash", slow_hash)
+    hasher = PasswordHasher(2, "thread")
+    try:
+        tasks = [asyncio.create_task(hasher.hash(f"{i}")) for i in range(6)]
+        await asyncio.sleep(0)
+        # Still waiting for the semaphore, so it is dropped without hashing
+        tasks[-1].cancel()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        hasher.shutdown()
+
+    assert results[:5] == ["0", "1", "2", "3", "4"]
+    assert isinstance(results[5], asyncio.CancelledError)
+    assert peak == 2
+    assert sorted(started) == ["0", "1", "2", "3", "4"]
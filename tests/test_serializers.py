@@ -0,0 +1,99 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+import pytest
+from pydantic import BaseModel, Field
+from src.models import Comment, Role, Summary, User
+from src.schemas.comment import CommentSchema
+from src.schemas.summary import SummarySchema
+from src.schemas.user import UserSchema
+from src.serializers import compile_serializer, format_datetime
+
+UTC = datetime(2023, 5, 1, 12, 30, tzinfo=timezone.utc)
+MOSCOW = UTC.astimezone(timezone(timedelta(hours=3), "MSK"))
+
+
+def build_user() -> User:
+    role = Role(id=1, name="user", description=None)
+    user = User(
+        id=1,
+        username="username",
+        email=None,
+        fio=None,
+        role=role,
+        created_at=UTC,
+        updated_at=MOSCOW,
+        summary_count=1,
+        comment_count=1,
+    )
+    summary = Summary(
+        id=1,
+        title="Title",
+        description=None,
+        comment_count=2,
+        created_at=MOSCOW,
+        updated_at=UTC,
+        user=user,
+    )
+    commenter = User(id=2, username="commenter", email="c@example.com", fio="Fio Fio")
+    for comment_id, author in ((1, user), (2, commenter)):
+        Comment(
+            id=comment_id,
+            text="Text",
+            created_at=UTC,
+            updated_at=MOSCOW,
+            user=author,
+            summary=summary,
+        )
+    return user
+
+
+def test_compiled_matches_from_orm():
+    """
+    Testing compiled serializers build the same dicts as from_orm
+    """
+    user = build_user()
+    summary, comment = user.summaries[0], user.comments[0]
+    for schema, obj in (
+        (UserSchema, user),
+        (SummarySchema, summary),
+        (CommentSchema, comment),
+    ):
+        assert compile_serializer(schema)(obj) == schema.from_orm(obj).dict()
+    assert "id" not in compile_serializer(UserSchema)(user)["role"]
+    assert len(compile_serializer(SummarySchema)(summary)["comments"]) == 2
+
+
+def test_format_datetime_time_zones():
+    """
+    Testing equal instants in different time zones keep their own offsets
+    """
+    assert UTC == MOSCOW
+    assert format_datetime(UTC) == "12:30:00 01.05.2023 UTC"
+    assert format_datetime(MOSCOW) == "15:30:00 01.05.2023 MSK"
+
+
+def test_compile_dict_exclude():
+    """
+    Testing flat dict excludes compile and nested ones are rejected
+    """
+
+    class Child(BaseModel):
+        id: int
+        name: str
+
+        class Config:
+            orm_mode = True
+
+    class Parent(BaseModel):
+        child: Child = Field(exclude={"id": ...})
+
+        class Config:
+            orm_mode = True
+
+    class NestedParent(BaseModel):
+        child: Child = Field(exclude={"id": {"nested"}})
+
+    obj = SimpleNamespace(child=SimpleNamespace(id=1, name="name"))
+    assert compile_serializer(Parent)(obj) == Parent.from_orm(obj).dict()
+    with pytest.raises(TypeError):
+        compile_serializer(NestedParent)
@@ -8,6 +8,8 @@ user = {
     "fio": Or(None, str),
     "created_at": str,
     "updated_at": str,
+    "summary_count": int,
+    "comment_count": int,
     "role": {"name": str, "description": str},
     "summaries": [
         {
@@ -22,3 +24,12 @@ user = {
 }
 
 users: list[user] = [user]
+
+user_autocomplete = [
+    {
+        "id": int,
+        "username": str,
+        "email": Or(None, Regex(r".*?@.*?\.[A-Za-z]{2,6}")),
+        "fio": Or(None, str),
+    }
+]
@@ -1,5 +1,7 @@
+import asyncio
 import pytest
 from httpx import AsyncClient
+from src.security import password_hasher
 from pytest_schema import exact_schema
 from .schemas import user, users
 from ..auth.schemas import login_response
@@ -19,6 +21,16 @@ async def test_create_user(client: AsyncClient):
     assert response.json().get("username") == user_data["username"]
 
 
+@pytest.mark.asyncio
+async def test_create_user_role(client: AsyncClient):
+    """
+    Trying to register as an admin
+    """
+    response = await client.post("/users", json={**user_data, "role_id": 2})
+    assert response.status_code == 201
+    assert response.json()["role"]["name"] == "user"
+
+
 @pytest.mark.asyncio
 async def test_create_couple_users(client: AsyncClient, create_user):
     """
@@ -41,6 +53,35 @@ async def test_create_couple_users(client: AsyncClient, create_user):
     assert exact_schema(users) == response.json()
 
 
+@pytest.mark.asyncio
+async def test_create_user_concurrently(client: AsyncClient, monkeypatch):
+    """
+    Trying to register the same username from concurrent requests
+    """
+    hashed = []
+    hash_password = password_hasher.hash
+
+    async def counting_hash(raw_password):
+        hashed.append(raw_password)
+        return await hash_password(raw_password)
+
+    monkeypatch.setattr(password_hasher, "hash", counting_hash)
+    responses = await asyncio.gather(
+        *(client.post("/users", json=user_data) for _ in range(4))
+    )
+    # Every request hashes, ON CONFLICT DO NOTHING turns all but one away
+    assert len(hashed) == 4
+    assert sorted(response.status_code for response in responses) == [
+        201,
+        400,
+        400,
+        400,
+    ]
+
+    response = await client.post("/auth/login", json=user_data)
+    assert response.status_code == 200
+
+
 @pytest.mark.asyncio
 async def test_create_blank_body(client: AsyncClient):
     """
@@ -53,3 +53,29 @@ async def test_delete_not_existed_user(
     response = await client.delete("/users/2", headers=authorization_header)
     assert response.status_code == 405
     assert response.json().get("detail") == "Method Not Allowed"
+
+
+@pytest.mark.asyncio
+async def test_delete_user_cascades(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Trying to delete user with summaries commented by another user
+    """
+    summary = {"title": "First Summary", "description": "It's description"}
+    await client.post(
+        "/summaries", json={**summary, "user_id": 1}, headers=authorization_header
+    )
+    await client.post("/users", json={"username": "user2", "password": "password"})
+    await client.post("/comments", json={"text": "text", "user_id": 2, "summary_id": 1})
+
+    response = await client.get("/users/2", headers=authorization_header)
+    assert len(response.json()["comments"]) == 1
+
+    response = await client.delete("/users/1", headers=authorization_header)
+    assert response.status_code == 204
+
+    response = await client.get("/users/2", headers=authorization_header)
+    assert response.json()["comments"] == []
+    response = await client.get("/summaries/1", headers=authorization_header)
+    assert response.status_code == 404
@@ -1,7 +1,7 @@
 import pytest
 from pytest_schema import exact_schema
 from httpx import AsyncClient
-from .schemas import users
+from .schemas import user, user_autocomplete, users
 
 
 @pytest.mark.asyncio
@@ -22,3 +22,143 @@ async def test_read_users(client: AsyncClient, create_user, authorization_header
     assert response.status_code == 200
     assert response.json() != []
     assert exact_schema(users) == response.json()
+
+
+@pytest.mark.asyncio
+async def test_read_users_paginated(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Testing users path pagination with cursors
+    """
+    for username in ("user2", "user3"):
+        await client.post("/users", json={"username": username, "password": "password"})
+
+    response = await client.get("/users?limit=2", headers=authorization_header)
+    assert response.status_code == 200
+    assert [u["id"] for u in response.json()] == [1, 2]
+    next_link = response.links["next"]["url"]
+
+    response = await client.get(next_link, headers=authorization_header)
+    assert response.status_code == 200
+    assert [u["id"] for u in response.json()] == [3]
+    assert "next" not in response.links
+    prev_link = response.links["prev"]["url"]
+
+    response = await client.get(prev_link, headers=authorization_header)
+    assert response.status_code == 200
+    assert [u["id"] for u in response.json()] == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_read_users_invalid_cursor(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Testing users path with malformed cursor and too big page
+    """
+    response = await client.get("/users?after=abc", headers=authorization_header)
+    assert response.status_code == 400
+    assert response.json().get("detail") == "Invalid cursor"
+
+    response = await client.get("/users?limit=100000", headers=authorization_header)
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_read_user_cached(client: AsyncClient, create_user, authorization_header):
+    """
+    Testing user detail is cached and invalidated on update
+    """
+    response = await client.get("/users/1", headers=authorization_header)
+    assert response.status_code == 200
+    assert response.headers["X-Cache"] == "MISS"
+
+    response = await client.get("/users/1", headers=authorization_header)
+    assert response.headers["X-Cache"] == "HIT"
+    assert exact_schema(user) == response.json()
+
+    await client.patch("/users/1", json={"fio": "my_fio"}, headers=authorization_header)
+    response = await client.get("/users/1", headers=authorization_header)
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.json().get("fio") == "my_fio"
+
+
+@pytest.mark.asyncio
+async def test_read_user_not_modified(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Testing user detail and list answer If-None-Match with 304
+    """
+    for path in ("/users/1", "/users"):
+        response = await client.get(path, headers=authorization_header)
+        etag = response.headers["ETag"]
+        response = await client.get(
+            path, headers={**authorization_header, "If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+    await client.patch("/users/1", json={"fio": "my_fio"}, headers=authorization_header)
+    response = await client.get(
+        "/users/1", headers={**authorization_header, "If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_read_user_sparse_fields(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Testing user detail with fields and include parameters
+    """
+    response = await client.get(
+        "/users/1?fields=id,username&include=summaries", headers=authorization_header
+    )
+    assert response.status_code == 200
+    assert response.json() == {"id": 1, "username": "username", "summaries": []}
+
+    response = await client.get("/users/me?include=role", headers=authorization_header)
+    assert response.status_code == 200
+    assert "summaries" not in response.json()
+    assert response.json()["role"] == {"name": "user", "description": "base user"}
+
+
+@pytest.mark.asyncio
+async def test_autocomplete_users(
+    client: AsyncClient, create_user, authorization_header
+):
+    """
+    Testing username autocomplete by prefix and with a typo
+    """
+    for username in ("alice", "alicia", "bob"):
+        await client.post("/users", json={"username": username, "password": "password"})
+
+    response = await client.get(
+        "/users/autocomplete?q=alic", headers=authorization_header
+    )
+    assert response.status_code == 200
+    assert exact_schema(user_autocomplete) == response.json()
+    assert {item["username"] for item in response.json()} == {"alice", "alicia"}
+
+    response = await client.get(
+        "/users/autocomplete?q=alicce", headers=authorization_header
+    )
+    assert [item["username"] for item in response.json()][0] == "alice"
+
+    response = await client.get(
+        "/users/autocomplete?q=alic&limit=1", headers=authorization_header
+    )
+    first = response.json()[0]["username"]
+    next_url = response.headers["Link"].split(";")[0].strip("<>")
+    response = await client.get(next_url, headers=authorization_header)
+    assert {first, response.json()[0]["username"]} == {"alice", "alicia"}
+
+    response = await client.get(
+        "/users/autocomplete?q=alic&limit=1000", headers=authorization_header
+    )
+    assert response.status_code == 422